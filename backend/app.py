@@ -1,242 +1,561 @@
-from flask import Flask, request, jsonify
+from flask import Flask, Response, request, jsonify, stream_with_context
+from flask.json.provider import DefaultJSONProvider
 from flask_cors import CORS
+from flask_compress import Compress
+from prometheus_flask_exporter import PrometheusMetrics
+import orjson
 import os
+import time
+import threading
+import atexit
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
+from typing import NamedTuple
+from functools import wraps
 from dotenv import load_dotenv
 import logging
 from services.metric_loader import MetricLoader
-from services.rca_analyzer import RCAAnalyzer
+from services.rca_analyzer import RCAAnalyzer, JSON_OPTIONS
 from services.log_analyzer import LogAnalyzer
+from services.single_flight import SingleFlight
+from services.http_client import close_shared_http_client
+from services.ttl_cache import TTLCache
+from services.telemetry import HotQueryCounter, time_phase, timed_call
 
 load_dotenv()
 
+class OrjsonProvider(DefaultJSONProvider):
+    """JSON provider backed by orjson for faster (de)serialization of large metric payloads"""
+    option = JSON_OPTIONS
+
+    def dumps(self, obj, **kwargs):
+        return orjson.dumps(obj, default=self.default, option=self.option).decode()
+
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        return self._app.response_class(
+            orjson.dumps(obj, default=self.default, option=self.option),
+            mimetype=self.mimetype
+        )
+
 app = Flask(__name__)
+app.json = OrjsonProvider(app)
 CORS(app)
 
+# Compress large JSON payloads (metrics, timelines, failure logs); the SSE stream
+# is left uncompressed so events are flushed as they are produced.
+app.config['COMPRESS_ALGORITHM'] = ['br', 'gzip']
+app.config['COMPRESS_LEVEL'] = 4
+app.config['COMPRESS_BR_LEVEL'] = 4
+app.config['COMPRESS_MIN_SIZE'] = 1024
+app.config['COMPRESS_STREAMS'] = False
+Compress(app)
+
+# Per-route latency histograms are exported at /metrics, alongside the
+# per-phase timings recorded in services.telemetry
+prometheus_metrics = PrometheusMetrics(app)
+
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 # Choose authentication method based on environment variable
 auth_method = os.getenv('AUTH_METHOD', 'api_key').lower()
 
-if auth_method == 'certificate':
-    logger.info("Using certificate-based authentication for Azure OpenAI")
-    from services.azure_ai_service_cert import AzureAIServiceCert
-    ai_service = AzureAIServiceCert()
-else:
-    logger.info("Using API key authentication for Azure OpenAI")
-    from services.azure_ai_service import AzureAIService
-    ai_service = AzureAIService()
+# The service modules pull in openai (and azure-identity for certificates), so the
+# chosen one is imported and constructed on first use rather than at worker boot
+_ai_service = None
+_ai_service_lock = threading.Lock()
+
+def get_ai_service():
+    """Return the Azure OpenAI service for the configured auth method, creating it on first use"""
+    global _ai_service
+    if _ai_service is None:
+        with _ai_service_lock:
+            if _ai_service is None:
+                if auth_method == 'certificate':
+                    logger.info("Using certificate-based authentication for Azure OpenAI")
+                    from services.azure_ai_service_cert import AzureAIServiceCert
+                    _ai_service = AzureAIServiceCert()
+                else:
+                    logger.info("Using API key authentication for Azure OpenAI")
+                    from services.azure_ai_service import AzureAIService
+                    _ai_service = AzureAIService()
+                # The health check may have cached 'lazy' for the service that now exists
+                _azure_configured_json.cache_clear()
+    return _ai_service
+
+# The AI service and its HTTP pool live for the whole worker; release the pooled
+# connections cleanly when the worker exits
+atexit.register(close_shared_http_client)
 
 metric_loader = MetricLoader()
 rca_analyzer = RCAAnalyzer()
 log_analyzer = LogAnalyzer()
 
-@app.route('/api/health', methods=['GET'])
-def health_check():
-    return jsonify({
-        'status': 'healthy',
-        'timestamp': datetime.now().isoformat(),
-        'services': {
-            'metric_loader': 'ready',
-            'rca_analyzer': 'ready',
-            'azure_ai': ai_service.is_configured()
-        }
-    })
+# Concurrent identical requests share one in-flight computation instead of
+# each re-running the analysis and the Azure OpenAI calls.
+analysis_flight = SingleFlight()
+chat_flight = SingleFlight()
 
-@app.route('/api/chat', methods=['POST'])
-def chat():
-    try:
-        data = request.json
-        user_query = data.get('query', '')
-        target_date = data.get('date', '2025-08-01')
-        
-        if not user_query:
-            return jsonify({'error': 'Query is required'}), 400
+hot_queries = HotQueryCounter(threshold=int(os.getenv('HOT_QUERY_THRESHOLD', 10)))
+
+DEFAULT_DATE = '2025-08-01'
+
+class ChatRequest(NamedTuple):
+    query: str
+    date: str
+
+def _parse_chat_request() -> ChatRequest:
+    """Read the query and target date from the JSON body, applying defaults"""
+    data = request.json or {}
+    return ChatRequest(data.get('query', ''), data.get('date', DEFAULT_DATE))
+
+def _now_iso() -> str:
+    return datetime.now().isoformat()
+
+# Parsed metrics are held in memory by MetricLoader and the directory scans below
+# are cached briefly. Ingestion jobs can evict both via /api/cache/invalidate.
+AVAILABLE_DATES_TTL_SECONDS = 30
+DEBUG_PATHS_TTL_SECONDS = 5
+# Completed chat pipelines are reused briefly so /api/chat and /api/chat/detailed
+# (or a client retrying) do not re-run the analysis and AI calls for the same query
+CHAT_RESULT_TTL_SECONDS = int(os.getenv('CHAT_RESULT_TTL_SECONDS', 60))
+chat_results = TTLCache(CHAT_RESULT_TTL_SECONDS, maxsize=256)
+
+def _ttl_cache(ttl_seconds):
+    """Cache the result of a zero-argument function for ttl_seconds"""
+    def decorator(fn):
+        state = {'value': None, 'expires_at': 0.0}
+        lock = threading.Lock()
+
+        @wraps(fn)
+        def wrapper():
+            with lock:
+                now = time.monotonic()
+                if now >= state['expires_at']:
+                    state['value'] = fn()
+                    state['expires_at'] = now + ttl_seconds
+                return state['value']
+
+        def cache_clear():
+            with lock:
+                state['expires_at'] = 0.0
+
+        wrapper.cache_clear = cache_clear
+        return wrapper
+    return decorator
+
+# The Azure OpenAI calls are network-bound and independent of each other,
+# so they run side by side on a shared pool instead of back to back.
+AI_EXECUTOR_WORKERS = int(os.getenv('AI_EXECUTOR_WORKERS', 8))
+# Optionally answer the query and analyze failure logs in one completion, trading
+# the parallel latency win for half the Azure OpenAI requests.
+COMBINE_AI_CALLS = os.getenv('COMBINE_AI_CALLS', 'false').lower() == 'true'
+ai_executor = ThreadPoolExecutor(max_workers=AI_EXECUTOR_WORKERS, thread_name_prefix='azure-ai')
+
+@_ttl_cache(AVAILABLE_DATES_TTL_SECONDS)
+def _get_available_dates_cached():
+    """Return available dates, rescanning the metric folders at most every TTL seconds"""
+    return metric_loader.get_available_dates()
+
+@_ttl_cache(DEBUG_PATHS_TTL_SECONDS)
+def _collect_debug_paths():
+    """Probe the metric folders with one directory scan each"""
+    base_path = metric_loader.base_path
+    
+    debug_info = {
+        'base_path': base_path,
+        'current_working_dir': os.getcwd(),
+        'directories': {},
+        'expected_files': {}
+    }
+    
+    for folder, file_suffix in metric_loader.metric_folders.items():
+        dir_path = os.path.join(base_path, folder)
+        file_name = f"{DEFAULT_DATE}_{file_suffix}.json"
         
-        logger.info(f"Processing query: {user_query} for date: {target_date}")
+        try:
+            with os.scandir(dir_path) as entries:
+                files = [entry.name for entry in entries]
+            dir_exists = True
+        except (FileNotFoundError, NotADirectoryError):
+            files = []
+            dir_exists = False
         
-        metrics = metric_loader.load_all_metrics(target_date)
-        if not metrics:
-            return jsonify({
-                'error': f'No metrics found for date {target_date}',
-                'available_dates': metric_loader.get_available_dates()
-            }), 404
+        debug_info['directories'][folder] = {
+            'path': dir_path,
+            'exists': dir_exists,
+            'files': files
+        }
         
-        analysis = rca_analyzer.analyze(metrics, target_date)
-
-        # If there are failure logs, perform AI analysis on them
-        failure_logs = analysis.get('failure_logs')
-        if failure_logs and failure_logs.get('available'):
-            logger.info("Performing AI analysis on failure logs...")
-            log_content = log_analyzer.get_log_content_for_llm(failure_logs)
-            ai_log_analysis = ai_service.analyze_failure_logs(log_content)
-            failure_logs['ai_analysis'] = ai_log_analysis
+        debug_info['expected_files'][folder] = {
+            'path': os.path.join(dir_path, file_name),
+            'exists': file_name in files
+        }
+    
+    return debug_info
+
+def _run_ai_calls(analysis, user_query, metrics, bypass_cache=False):
+    """Run failure log analysis and response generation concurrently, returning the AI response"""
+    log_future = None
+    failure_logs = analysis.get('failure_logs')
+    if failure_logs and failure_logs.get('available'):
+        logger.info("Performing AI analysis on failure logs...")
+        log_content = log_analyzer.get_log_content_for_llm(failure_logs)
+        if COMBINE_AI_CALLS:
+            # One round-trip for both tasks instead of two parallel ones
+            with time_phase('generate_combined'):
+                combined = get_ai_service().generate_combined(analysis, log_content, user_query, metrics, bypass_cache)
+            failure_logs['ai_analysis'] = combined['log_analysis']
             logger.info("AI log analysis complete")
+            return combined['answer']
+        log_future = ai_executor.submit(timed_call, 'analyze_failure_logs', get_ai_service().analyze_failure_logs, log_content)
 
-        ai_response = ai_service.generate_response(
-            analysis=analysis,
-            user_query=user_query,
-            metrics=metrics
-        )
+    response_future = ai_executor.submit(
+        timed_call, 'generate_response', get_ai_service().generate_response,
+        analysis=analysis,
+        user_query=user_query,
+        metrics=metrics,
+        bypass_cache=bypass_cache
+    )
 
-        response = {
-            'analysis': ai_response,
-            'timeline': analysis['timeline'],
-            'metrics_summary': analysis['metrics_summary'],
-            'sla_status': analysis['sla_status'],
-            'root_causes': analysis['root_causes'],
-            'failure_logs': failure_logs,
-            'timestamp': datetime.now().isoformat()
+    if log_future is not None:
+        failure_logs['ai_analysis'] = log_future.result()
+        logger.info("AI log analysis complete")
+
+    return response_future.result()
+
+def _analyze_shared(metrics, target_date):
+    """Analyze a date once for all concurrent callers, returning a per-caller copy"""
+    with time_phase('analyze'):
+        shared = analysis_flight.do(target_date, rca_analyzer.analyze, metrics, target_date)
+    # The AI step writes into failure_logs, so callers get their own top-level dicts
+    analysis = dict(shared)
+    if shared.get('failure_logs'):
+        analysis['failure_logs'] = dict(shared['failure_logs'])
+    return analysis
+
+def _build_steps(metrics, analysis):
+    """Build the step-by-step details shown by the detailed and streaming endpoints"""
+    marker_info = None
+    if metrics.get('markerEvent'):
+        marker = metrics['markerEvent']
+        marker_info = {
+            'arrival_time': marker.get('actual_arrival_time'),
+            'expected_time': marker.get('expected_arrival_time'),
+            'delay_minutes': marker.get('delay_in_minutes', 0),
+            'product': marker.get('product')
         }
 
-        return jsonify(response)
-        
+    sla = analysis.get('sla_status') or {}
+
+    return {
+        'marker_check': {
+            'status': 'complete',
+            'data': marker_info
+        },
+        'dag_analysis': {
+            'status': 'complete',
+            'data': {
+                'start_time': sla.get('arrival_time'),
+                'end_time': sla.get('completion_time'),
+                'duration': analysis.get('processing_duration')
+            }
+        },
+        'infrastructure_check': {
+            'status': 'complete',
+            'data': analysis.get('metrics_summary')
+        }
+    }
+
+def _encode_fields(fields):
+    """
+    Encode a flat dict as a JSON object. bytes values are treated as already
+    serialized JSON and spliced in as-is; keys are sorted like the JSON provider's.
+    """
+    parts = []
+    for key in sorted(fields):
+        value = fields[key]
+        if not isinstance(value, bytes):
+            value = orjson.dumps(value, default=app.json.default, option=JSON_OPTIONS)
+        parts.append(orjson.dumps(key) + b':' + value)
+    return b'{' + b','.join(parts) + b'}'
+
+def _sse_event(event, data):
+    """Format a Server-Sent Events message with a JSON payload (or pre-encoded bytes)"""
+    payload = data.decode() if isinstance(data, bytes) else app.json.dumps(data)
+    return f"event: {event}\ndata: {payload}\n\n"
+
+def _run_full(target_date, user_query, bypass_cache=False):
+    """
+    Run the whole chat pipeline for a query: load metrics, analyze, generate the
+    AI response and build the steps. Returns None when no metrics exist for the date.
+    """
+    with time_phase('load_metrics'):
+        metrics = metric_loader.load_all_metrics(target_date)
+    if not metrics:
+        return None
+
+    analysis = _analyze_shared(metrics, target_date)
+    ai_response = _run_ai_calls(analysis, user_query, metrics, bypass_cache)
+    result = {
+        'steps': _build_steps(metrics, analysis),
+        'analysis': analysis,
+        'ai_response': ai_response,
+        # Encoded once here; cached results are then served without re-serializing the log analysis
+        'failure_logs_json': orjson.dumps(analysis.get('failure_logs'), default=app.json.default, option=JSON_OPTIONS)
+    }
+    chat_results.set((target_date, user_query), result)
+    return result
+
+def _get_chat_result(target_date, user_query, refresh=False):
+    """
+    Return a recent pipeline result for (date, query), running it once if needed.
+    refresh skips the cached result and the cached completion.
+    """
+    if refresh:
+        return chat_flight.do((target_date, user_query, 'refresh'), _run_full, target_date, user_query, True)
+    key = (target_date, user_query)
+    result = chat_results.get(key)
+    if result is None:
+        # Identical in-flight queries share a single pipeline run
+        result = chat_flight.do(key, _run_full, target_date, user_query)
+    return result
+
+def _metrics_not_found(target_date):
+    return jsonify({
+        'error': f'No metrics found for date {target_date}',
+        'available_dates': _get_available_dates_cached()
+    }), 404
+
+def _handle_chat(detailed):
+    """Shared body of /api/chat and /api/chat/detailed; only the response shape differs"""
+    user_query, target_date = _parse_chat_request()
+
+    if not user_query:
+        return jsonify({'error': 'Query is required'}), 400
+
+    logger.info("Processing %squery: %s for date: %s", 'detailed ' if detailed else '', user_query, target_date)
+    hot_queries.record(target_date, user_query)
+
+    # Clients can force a fresh answer with {"refresh": true}
+    refresh = bool((request.json or {}).get('refresh'))
+    result = _get_chat_result(target_date, user_query, refresh)
+    if result is None:
+        return _metrics_not_found(target_date)
+
+    analysis = result['analysis']
+    response = {
+        'analysis': result['ai_response'],
+        'timeline': analysis['timeline_json'],
+        'metrics_summary': analysis['metrics_summary_json'],
+        'sla_status': analysis['sla_status'],
+        'root_causes': analysis['root_causes'],
+        'failure_logs': result['failure_logs_json'],
+        'timestamp': _now_iso()
+    }
+    if detailed:
+        response['steps'] = result['steps']
+
+    with time_phase('serialize'):
+        return Response(_encode_fields(response), mimetype='application/json')
+
+# Health checks are polled by load balancers, so the body is a pre-built template
+# and only the timestamp is formatted per request.
+HEALTH_TTL_SECONDS = 30
+_HEALTH_TEMPLATE = (
+    b'{"status":"healthy","timestamp":"%s","services":'
+    b'{"metric_loader":"ready","rca_analyzer":"ready","azure_ai":%s}}'
+)
+
+@_ttl_cache(HEALTH_TTL_SECONDS)
+def _azure_configured_json():
+    # Report 'lazy' rather than forcing the service import from a health probe
+    if _ai_service is None:
+        return b'"lazy"'
+    return b'true' if _ai_service.is_configured() else b'false'
+
+@app.route('/api/health', methods=['GET'])
+def health_check():
+    body = _HEALTH_TEMPLATE % (_now_iso().encode(), _azure_configured_json())
+    return Response(body, mimetype='application/json')
+
+@app.route('/api/chat', methods=['POST'])
+def chat():
+    try:
+        return _handle_chat(detailed=False)
     except Exception as e:
-        logger.error(f"Error processing chat request: {str(e)}")
+        logger.error("Error processing chat request: %s", e)
         return jsonify({'error': str(e)}), 500
 
 @app.route('/api/chat/detailed', methods=['POST'])
 def chat_detailed():
     """Enhanced endpoint that returns step-by-step analysis details"""
     try:
-        data = request.json
-        user_query = data.get('query', '')
-        target_date = data.get('date', '2025-08-01')
+        return _handle_chat(detailed=True)
+    except Exception as e:
+        logger.error("Error processing detailed chat request: %s", e)
+        return jsonify({'error': str(e)}), 500
+
+MAX_BATCH_QUERIES = 5
+
+@app.route('/api/chat/batch', methods=['POST'])
+def chat_batch():
+    """Answer several follow-up questions about one date with a single Azure OpenAI call"""
+    try:
+        data = request.json or {}
+        user_queries = [query for query in data.get('queries', []) if query]
+        target_date = data.get('date', DEFAULT_DATE)
         
-        if not user_query:
-            return jsonify({'error': 'Query is required'}), 400
+        if not user_queries:
+            return jsonify({'error': 'At least one query is required'}), 400
+        if len(user_queries) > MAX_BATCH_QUERIES:
+            return jsonify({'error': f'At most {MAX_BATCH_QUERIES} queries can be batched'}), 400
         
-        logger.info(f"Processing detailed query: {user_query} for date: {target_date}")
+        logger.info("Processing %d batched queries for date: %s", len(user_queries), target_date)
         
-        # Step 1: Load metrics
-        metrics = metric_loader.load_all_metrics(target_date)
+        with time_phase('load_metrics'):
+            metrics = metric_loader.load_all_metrics(target_date)
         if not metrics:
-            return jsonify({
-                'error': f'No metrics found for date {target_date}',
-                'available_dates': metric_loader.get_available_dates()
-            }), 404
+            return _metrics_not_found(target_date)
         
-        # Step 2: Extract key information for steps
-        marker_info = None
-        if metrics.get('markerEvent'):
-            marker = metrics['markerEvent']
-            marker_info = {
-                'arrival_time': marker.get('actual_arrival_time'),
-                'expected_time': marker.get('expected_arrival_time'),
-                'delay_minutes': marker.get('delay_in_minutes', 0),
-                'product': marker.get('product')
-            }
+        analysis = _analyze_shared(metrics, target_date)
+        with time_phase('generate_responses_batched'):
+            answers = get_ai_service().generate_responses_batched(analysis, user_queries, metrics)
         
-        # Step 3: Perform analysis
-        analysis = rca_analyzer.analyze(metrics, target_date)
-
-        # If there are failure logs, perform AI analysis on them
-        failure_logs = analysis.get('failure_logs')
-        if failure_logs and failure_logs.get('available'):
-            logger.info("Performing AI analysis on failure logs...")
-            log_content = log_analyzer.get_log_content_for_llm(failure_logs)
-            ai_log_analysis = ai_service.analyze_failure_logs(log_content)
-            failure_logs['ai_analysis'] = ai_log_analysis
-            logger.info("AI log analysis complete")
-
-        # Step 4: Get AI response
-        ai_response = ai_service.generate_response(
-            analysis=analysis,
-            user_query=user_query,
-            metrics=metrics
-        )
-
-        # Create detailed response with steps
-        response = {
-            'steps': {
-                'marker_check': {
-                    'status': 'complete',
-                    'data': marker_info
-                },
-                'dag_analysis': {
-                    'status': 'complete',
-                    'data': {
-                        'start_time': analysis['sla_status'].get('arrival_time') if analysis.get('sla_status') else None,
-                        'end_time': analysis['sla_status'].get('completion_time') if analysis.get('sla_status') else None,
-                        'duration': analysis.get('processing_duration')
-                    }
-                },
-                'infrastructure_check': {
-                    'status': 'complete',
-                    'data': analysis.get('metrics_summary')
-                }
-            },
-            'analysis': ai_response,
-            'timeline': analysis['timeline'],
-            'metrics_summary': analysis['metrics_summary'],
+        return jsonify({
+            'answers': [{'query': query, 'analysis': answer} for query, answer in zip(user_queries, answers)],
             'sla_status': analysis['sla_status'],
             'root_causes': analysis['root_causes'],
-            'failure_logs': failure_logs,
-            'timestamp': datetime.now().isoformat()
-        }
-        
-        return jsonify(response)
+            'timestamp': _now_iso()
+        })
         
     except Exception as e:
-        logger.error(f"Error processing detailed chat request: {str(e)}")
+        logger.error("Error processing batched chat request: %s", e)
         return jsonify({'error': str(e)}), 500
 
+@app.route('/api/chat/stream', methods=['POST'])
+def chat_stream():
+    """
+    Streaming variant of /api/chat/detailed using Server-Sent Events.
+    Emits the analysis steps as soon as they are computed, then the AI response
+    token by token, then the failure log analysis.
+    """
+    user_query, target_date = _parse_chat_request()
+
+    if not user_query:
+        return jsonify({'error': 'Query is required'}), 400
+
+    logger.info("Processing streaming query: %s for date: %s", user_query, target_date)
+    hot_queries.record(target_date, user_query)
+
+    with time_phase('load_metrics'):
+        metrics = metric_loader.load_all_metrics(target_date)
+    if not metrics:
+        return _metrics_not_found(target_date)
+
+    def generate():
+        try:
+            analysis = _analyze_shared(metrics, target_date)
+
+            # Failure log analysis runs in the background while tokens stream
+            log_future = None
+            failure_logs = analysis.get('failure_logs')
+            if failure_logs and failure_logs.get('available'):
+                logger.info("Performing AI analysis on failure logs...")
+                log_content = log_analyzer.get_log_content_for_llm(failure_logs)
+                log_future = ai_executor.submit(timed_call, 'analyze_failure_logs', get_ai_service().analyze_failure_logs, log_content)
+
+            yield _sse_event('steps', _encode_fields({
+                'steps': _build_steps(metrics, analysis),
+                'timeline': analysis['timeline_json'],
+                'metrics_summary': analysis['metrics_summary_json'],
+                'sla_status': analysis['sla_status'],
+                'root_causes': analysis['root_causes']
+            }))
+
+            with time_phase('generate_response_stream'):
+                for chunk in get_ai_service().generate_response_stream(
+                    analysis=analysis,
+                    user_query=user_query,
+                    metrics=metrics
+                ):
+                    yield _sse_event('token', {'content': chunk})
+
+            if log_future is not None:
+                failure_logs['ai_analysis'] = log_future.result()
+                logger.info("AI log analysis complete")
+
+            yield _sse_event('failure_logs', failure_logs)
+            yield _sse_event('done', {'timestamp': _now_iso()})
+
+        except Exception as e:
+            logger.error("Error processing streaming chat request: %s", e)
+            yield _sse_event('error', {'error': str(e)})
+
+    return Response(
+        stream_with_context(generate()),
+        mimetype='text/event-stream',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    )
+
 @app.route('/api/metrics/<date>', methods=['GET'])
 def get_metrics(date):
     try:
         metrics = metric_loader.load_all_metrics(date)
         if not metrics:
-            return jsonify({
-                'error': f'No metrics found for date {date}',
-                'available_dates': metric_loader.get_available_dates()
-            }), 404
+            return _metrics_not_found(date)
         
         return jsonify(metrics)
         
     except Exception as e:
-        logger.error(f"Error loading metrics: {str(e)}")
+        logger.error("Error loading metrics: %s", e)
         return jsonify({'error': str(e)}), 500
 
 @app.route('/api/debug/paths', methods=['GET'])
 def debug_paths():
     """Debug endpoint to check file paths"""
-    import os
-    base_path = metric_loader.base_path
-    
-    debug_info = {
-        'base_path': base_path,
-        'current_working_dir': os.getcwd(),
-        'directories': {},
-        'expected_files': {}
-    }
-    
-    for folder, file_suffix in metric_loader.metric_folders.items():
-        dir_path = os.path.join(base_path, folder)
-        file_path = os.path.join(base_path, folder, f"2025-08-01_{file_suffix}.json")
-        
-        debug_info['directories'][folder] = {
-            'path': dir_path,
-            'exists': os.path.exists(dir_path),
-            'files': os.listdir(dir_path) if os.path.exists(dir_path) else []
-        }
-        
-        debug_info['expected_files'][folder] = {
-            'path': file_path,
-            'exists': os.path.exists(file_path)
-        }
-    
-    return jsonify(debug_info)
+    return jsonify(_collect_debug_paths())
 
 @app.route('/api/available-dates', methods=['GET'])
 def get_available_dates():
     try:
-        dates = metric_loader.get_available_dates()
+        dates = _get_available_dates_cached()
         return jsonify({'dates': dates})
     except Exception as e:
-        logger.error(f"Error getting available dates: {str(e)}")
+        logger.error("Error getting available dates: %s", e)
         return jsonify({'error': str(e)}), 500
 
+@app.route('/api/cache/invalidate', methods=['POST'])
+def invalidate_cache():
+    """Evict cached metrics so newly ingested files are picked up"""
+    metric_loader.clear_cache()
+    _get_available_dates_cached.cache_clear()
+    _collect_debug_paths.cache_clear()
+    chat_results.clear()
+    logger.info("Metric caches invalidated")
+    return jsonify({'status': 'invalidated'})
+
+def _warmup():
+    """Load every available date's metrics (and optionally the AI client) before the first real request"""
+    try:
+        metric_loader.preload()
+        # Off by default: building it imports openai/azure-identity in every worker at boot
+        if os.getenv('WARMUP_AI_SERVICE', 'false').lower() == 'true':
+            get_ai_service()
+        logger.info("Warmup complete")
+    except Exception as e:
+        logger.warning("Warmup failed: %s", e)
+
+# Warm up in the background so worker boot is not blocked
+if os.getenv('WARMUP_ON_START', 'true').lower() == 'true':
+    threading.Thread(target=_warmup, name='warmup', daemon=True).start()
+
 if __name__ == '__main__':
+    # Development server only; production runs under gunicorn (see gunicorn.conf.py)
     port = int(os.getenv('PORT', 5000))
-    app.run(host='0.0.0.0', port=port, debug=True)
\ No newline at end of file
+    debug = os.getenv('FLASK_DEBUG', 'false').lower() == 'true'
+    app.run(host='0.0.0.0', port=port, debug=debug, threaded=True)
\ No newline at end of file
@@ -0,0 +1,66 @@
+"""
+Run the RCA question for many dates through the Azure OpenAI Batch API.
+
+Intended for backfills and nightly digests where answers are not needed
+interactively; the API server keeps using real-time completions.
+
+    python batch_rca.py                      # every available date
+    python batch_rca.py 2025-08-01 2025-08-02 --output rca.json
+"""
+import argparse
+import os
+import logging
+import orjson
+from dotenv import load_dotenv
+from services.metric_loader import MetricLoader
+from services.rca_analyzer import RCAAnalyzer
+
+load_dotenv()
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+DEFAULT_QUERY = "Provide a root cause analysis of derivatives processing for this date"
+
+
+def create_ai_service():
+    if os.getenv('AUTH_METHOD', 'api_key').lower() == 'certificate':
+        from services.azure_ai_service_cert import AzureAIServiceCert
+        return AzureAIServiceCert()
+    from services.azure_ai_service import AzureAIService
+    return AzureAIService()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('dates', nargs='*', help='Dates to analyze (default: all available)')
+    parser.add_argument('--query', default=DEFAULT_QUERY, help='Question asked for every date')
+    parser.add_argument('--output', default='batch_rca.json', help='Where to write the answers')
+    args = parser.parse_args()
+
+    metric_loader = MetricLoader()
+    rca_analyzer = RCAAnalyzer()
+
+    items = []
+    dates = []
+    for date in args.dates or metric_loader.get_available_dates():
+        metrics = metric_loader.load_all_metrics(date)
+        if not metrics:
+            logger.warning(f"No metrics found for date {date}, skipping")
+            continue
+        items.append((rca_analyzer.analyze(metrics, date), args.query, metrics))
+        dates.append(date)
+
+    if not items:
+        logger.error("Nothing to analyze")
+        return
+
+    answers = create_ai_service().generate_responses_batch(items)
+    results = {date: answer for date, answer in zip(dates, answers)}
+    with open(args.output, 'wb') as f:
+        f.write(orjson.dumps({'query': args.query, 'answers': results}, option=orjson.OPT_INDENT_2))
+    logger.info(f"Wrote {len(results)} answer(s) to {args.output}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,14 @@
+# Gunicorn configuration for the RCA backend.
+# Request time is dominated by Azure OpenAI round-trips, so each worker runs a
+# pool of threads that block on network I/O concurrently.
+import multiprocessing
+import os
+
+bind = f"0.0.0.0:{os.getenv('PORT', 5000)}"
+worker_class = 'gthread'
+workers = int(os.getenv('GUNICORN_WORKERS', multiprocessing.cpu_count()))
+threads = int(os.getenv('GUNICORN_THREADS', 16))
+timeout = int(os.getenv('GUNICORN_TIMEOUT', 120))
+keepalive = 5
+accesslog = '-'
+errorlog = '-'
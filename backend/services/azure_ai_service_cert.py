@@ -1,19 +1,41 @@
 import os
-import json
 import traceback
-from typing import Dict, List, Any
+from typing import Dict, List, Any, Tuple
 import logging
+import threading
+import time
 from openai import AzureOpenAI
-from azure.identity import CertificateCredential
-from datetime import datetime, timedelta
+from services.http_client import get_shared_http_client
+from services.azure_ai_base import AzureAIServiceBase, _Backend
+from datetime import datetime
 
 logger = logging.getLogger(__name__)
+# Relative AZURE_CERT_PATH values are resolved against the backend directory
+_BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.realpath(__file__)))
+
+TOKEN_SCOPE = "https://cognitiveservices.azure.com/.default"
+# Azure SDK default: treat a token as expired five minutes early. From then on a fresh
+# token is fetched in the background while requests keep using the current one.
+TOKEN_REFRESH_SKEW_SECONDS = 300
+# Requests only wait for a refresh once the token is this close to expiring
+TOKEN_EXPIRY_MARGIN_SECONDS = 60
+TOKEN_BACKGROUND_RETRY_SECONDS = 30
+
+# How long to wait before retrying a client initialization that failed
+CLIENT_INIT_RETRY_SECONDS = 30
+
+# Credentials are shared by every service instance in the process. CertificateCredential
+# keeps acquired tokens in its own in-memory cache (per scope), so a new instance reuses a
+# live token instead of making another AAD round trip.
+_credentials: Dict[Tuple[str, str, str], Any] = {}
+_credentials_lock = threading.Lock()
+
+class AzureAIServiceCert(AzureAIServiceBase):
+    DEFAULT_API_VERSION = '2024-12-01-preview'
+    DEFAULT_DEPLOYMENT = 'gpt-4o-2024-08-06'
 
-class AzureAIServiceCert:
     def __init__(self):
-        self.endpoint = os.getenv('AZURE_OPENAI_ENDPOINT')
-        self.api_version = os.getenv('AZURE_OPENAI_API_VERSION', '2024-12-01-preview')
-        self.deployment = os.getenv('AZURE_OPENAI_DEPLOYMENT', 'gpt-4o-2024-08-06')
+        super().__init__()
         self.client_id = os.getenv('AZURE_SPN_CLIENT_ID')
         self.tenant_id = os.getenv('AZURE_TENANT_ID')
         self.user_sid = os.getenv('USER_SID', '1792420')
@@ -23,45 +45,87 @@ class AzureAIServiceCert:
         if os.path.isabs(cert_path_env):
             self.cert_path = cert_path_env
         else:
-            # Make it relative to backend directory
-            backend_dir = os.path.dirname(os.path.dirname(os.path.realpath(__file__)))
-            self.cert_path = os.path.join(backend_dir, cert_path_env)
+            self.cert_path = os.path.join(_BACKEND_DIR, cert_path_env)
         
-        self.client = None
         self.access_token = None
         self.token_expiry = None
+        self.token_refresh_on = None
         self.credential = None
+        # Concurrent requests that find the token expired share a single refresh
+        self._token_lock = threading.Lock()
+        self._background_refresh = False
+        self._background_refresh_lock = threading.Lock()
+        self._init_lock = threading.Lock()
+        self._next_init_attempt = 0.0
         
-        if self.endpoint and self.client_id and self.tenant_id:
-            try:
-                self._initialize_client()
-                logger.info("Azure OpenAI client with certificate auth initialized successfully")
-            except Exception as e:
-                logger.error(f"Failed to initialize Azure OpenAI client: {str(e)}")
+        self._ensure_client()
+    
+    def _ensure_client(self) -> bool:
+        """
+        Return whether a client is available. A client that failed to initialize (e.g. AAD
+        unreachable at startup) is retried at most every CLIENT_INIT_RETRY_SECONDS instead
+        of leaving the worker on fallback answers for its whole lifetime.
+        """
+        if self.client is not None:
+            return True
+        if not (self.endpoint and self.client_id and self.tenant_id) or time.monotonic() < self._next_init_attempt:
+            return False
+        
+        with self._init_lock:
+            if self.client is None and time.monotonic() >= self._next_init_attempt:
+                self._next_init_attempt = time.monotonic() + CLIENT_INIT_RETRY_SECONDS
+                try:
+                    self._initialize_client()
+                    logger.info("Azure OpenAI client with certificate auth initialized successfully")
+                except Exception as e:
+                    logger.error(f"Failed to initialize Azure OpenAI client: {str(e)}")
+        return self.client is not None
     
     def _initialize_credential(self):
         """Initialize the credential object once"""
         if not self.credential:
             logger.debug("Initializing certificate credential...")
-            logger.debug(f"Certificate path: {self.cert_path}")
-            
-            if not os.path.exists(self.cert_path):
-                logger.error(f"Certificate file does not exist at: {self.cert_path}")
-                raise FileNotFoundError(f"Certificate file not found: {self.cert_path}")
-            
-            # Check environment variables
-            for env_var in ["AZURE_SPN_CLIENT_ID", "AZURE_TENANT_ID"]:
-                if not os.getenv(env_var):
-                    logger.error(f"Environment variable {env_var} is not set")
-                    raise ValueError(f"Environment variable {env_var} is not set")
             
-            self.credential = CertificateCredential(
-                client_id=self.client_id,
-                certificate_path=self.cert_path,
-                tenant_id=self.tenant_id,
-                logging_enable=True  # Enable Azure SDK logging
-            )
+            with _credentials_lock:
+                credential = _credentials.get(self._credential_key())
+                if credential is None:
+                    # Validated only when a credential is actually built; a shared one already
+                    # loaded the certificate (CertificateCredential reads it once, at construction)
+                    logger.debug("Certificate path: %s", self.cert_path)
+                    if not os.path.exists(self.cert_path):
+                        logger.error(f"Certificate file does not exist at: {self.cert_path}")
+                        raise FileNotFoundError(f"Certificate file not found: {self.cert_path}")
+                    
+                    # Check environment variables
+                    for env_var in ["AZURE_SPN_CLIENT_ID", "AZURE_TENANT_ID"]:
+                        if not os.getenv(env_var):
+                            logger.error(f"Environment variable {env_var} is not set")
+                            raise ValueError(f"Environment variable {env_var} is not set")
+                    
+                    # azure-identity (msal, cryptography) is only loaded once certificate auth is
+                    # actually configured; if it is missing the service falls back to rule-based answers
+                    from azure.identity import CertificateCredential
+                    
+                    credential = CertificateCredential(
+                        client_id=self.client_id,
+                        certificate_path=self.cert_path,
+                        tenant_id=self.tenant_id,
+                        # Azure SDK HTTP logging is costly and verbose, so it is opt-in
+                        logging_enable=os.getenv('AZURE_SDK_VERBOSE_LOGS') == '1'
+                    )
+                    _credentials[self._credential_key()] = credential
+            self.credential = credential
             logger.debug("Certificate credential initialized successfully")
+    
+    def _credential_key(self) -> Tuple[str, str, str]:
+        return (self.tenant_id, self.client_id, self.cert_path)
+    
+    def _drop_credential(self):
+        """Forget the shared credential, so the next token comes from AAD rather than its token cache"""
+        with _credentials_lock:
+            if _credentials.get(self._credential_key()) is self.credential:
+                _credentials.pop(self._credential_key(), None)
+        self.credential = None
 
     def get_access_token(self):
         """Get Azure AD access token using certificate authentication"""
@@ -71,15 +135,18 @@ class AzureAIServiceCert:
             # Initialize credential if not already done
             self._initialize_credential()
             
-            scope = "https://cognitiveservices.azure.com/.default"
-            
-            token_response = self.credential.get_token(scope)
+            token_response = self.credential.get_token(TOKEN_SCOPE)
             self.access_token = token_response.token
             
-            # Azure tokens typically expire in 1 hour, we'll refresh 5 minutes before expiry
-            self.token_expiry = datetime.now() + timedelta(minutes=55)
+            # Both thresholds follow the token's own expiry (epoch seconds) rather than
+            # assuming a fixed lifetime. Short-lived tokens (conditional access) rotate at
+            # 80% of their lifetime instead of spending most of it in the refresh window.
+            lifetime = max(token_response.expires_on - time.time(), 0)
+            self.token_refresh_on = token_response.expires_on - min(TOKEN_REFRESH_SKEW_SECONDS, 0.2 * lifetime)
+            self.token_expiry = token_response.expires_on - min(TOKEN_EXPIRY_MARGIN_SECONDS, 0.1 * lifetime)
             
-            logger.debug(f"Access token obtained successfully, expires at: {self.token_expiry}")
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug("Access token obtained successfully, refreshing after: %s", datetime.fromtimestamp(self.token_refresh_on))
             
             return self.access_token
         except Exception as e:
@@ -98,487 +165,103 @@ class AzureAIServiceCert:
             self.access_token = self.get_access_token()
             
             # Initialize Azure OpenAI client
-            # Note: API key is still required even with certificate auth (as per sample)
+            # The SDK asks for the token on every request, so refreshes keep this client and its pool.
+            # Note: API key is still required even with certificate auth (as per sample); with a
+            # token provider the SDK no longer adds it, so it goes out as a default header.
             logger.debug("Initializing OpenAI client...")
-            self.client = AzureOpenAI(
-                api_key=os.getenv("AZURE_OPENAI_API_KEY", "placeholder-api-key"),
+            client = AzureOpenAI(
                 azure_endpoint=self.endpoint,
                 api_version=self.api_version,
+                azure_ad_token_provider=self._current_token,
                 default_headers={
-                    "Authorization": f"Bearer {self.access_token}",
+                    "api-key": os.getenv("AZURE_OPENAI_API_KEY", "placeholder-api-key"),
                     "user_sid": self.user_sid
-                }
+                },
+                http_client=get_shared_http_client(),
+                timeout=self.request_timeout,
+                max_retries=0  # retried with backoff in _create_completion
             )
+            # Backends first: requests start routing as soon as self.client is set
+            self.backends = [_Backend(client, self.deployment, 1.0)]
+            self.client = client
             logger.info("Azure OpenAI client initialized successfully with fresh token")
         except Exception as e:
             logger.error(f"Failed to initialize client: {str(e)}")
             logger.error(traceback.format_exc())
             # Reset credential for next attempt
-            self.credential = None
+            self._drop_credential()
             self.access_token = None
             self.token_expiry = None
+            self.token_refresh_on = None
             raise
     
-    def is_configured(self) -> bool:
-        return self.client is not None
+    def _before_request(self):
+        # Refresh token if needed (tokens expire after ~1 hour)
+        self._refresh_token_if_needed()
     
-    def generate_response(self, analysis: Dict, user_query: str, metrics: Dict) -> str:
-        if not self.client:
-            logger.warning("Azure OpenAI client not configured, using fallback response")
-            return self._generate_fallback_response(analysis, user_query)
-        
-        try:
-            # Refresh token if needed (tokens expire after ~1 hour)
-            self._refresh_token_if_needed()
-            
-            context = self._prepare_context(analysis, metrics)
-            prompt = self._create_prompt(context, user_query, analysis)
-            
-            messages = [
-                {"role": "system", "content": self._get_system_prompt()},
-                {"role": "user", "content": prompt}
-            ]
-            
-            logger.debug("Calling Azure OpenAI API...")
-            response = self.client.chat.completions.create(
-                model=self.deployment,
-                messages=messages,
-                temperature=0.7,
-                max_tokens=1500
-            )
-            
-            return response.choices[0].message.content
-            
-        except Exception as e:
-            logger.error(f"Azure OpenAI API error: {str(e)}")
-            logger.error(traceback.format_exc())
-            # Try to refresh token and retry once
-            try:
-                logger.info("Attempting to refresh token and retry...")
-                self._initialize_client()
-                response = self.client.chat.completions.create(
-                    model=self.deployment,
-                    messages=messages,
-                    temperature=0.7,
-                    max_tokens=1500
-                )
-                return response.choices[0].message.content
-            except:
-                return self._generate_fallback_response(analysis, user_query)
+    def _on_auth_error(self) -> bool:
+        # A revoked or expired token: fetch a new one and retry on the same client. The shared
+        # credential would hand back the rejected token from its cache, so it is rebuilt first.
+        logger.info("Token rejected, refreshing token and retrying...")
+        self._drop_credential()
+        self._refresh_token_if_needed(force=True)
+        return True
     
-    def _refresh_token_if_needed(self):
-        """Refresh the access token if it's expired or about to expire"""
+    def _current_token(self) -> str:
+        """Token provider for the OpenAI client; refreshes swap self.access_token"""
+        return self.access_token
+
+    def _token_expired(self) -> bool:
+        return not self.access_token or not self.token_expiry or time.time() >= self.token_expiry
+    
+    def _refresh_token_if_needed(self, force: bool = False):
+        """Refresh the access token if it's expired or about to expire (or unconditionally with force)"""
+        # Lock-free fast path: nearly every call finds a valid token
+        if not force and not self._token_expired():
+            if self.token_refresh_on and time.time() >= self.token_refresh_on:
+                self._start_background_refresh()
+            else:
+                logger.debug("Token still valid, refreshing after: %s", self.token_refresh_on)
+            return
+        
+        seen_token = self.access_token
         try:
-            # Check if token is missing or expired
-            if not self.access_token or not self.token_expiry or datetime.now() >= self.token_expiry:
-                logger.info("Token expired or missing, refreshing...")
-                self.access_token = self.get_access_token()
-                
-                # Update the client headers with the new token
-                if self.client:
-                    self.client.default_headers["Authorization"] = f"Bearer {self.access_token}"
+            with self._token_lock:
+                # Threads that queued behind a refresh reuse its token instead of fetching another
+                if self.access_token != seen_token and not self._token_expired():
+                    return
+                if force or self._token_expired():
+                    logger.info("Token expired or missing, refreshing...")
+                    self.access_token = self.get_access_token()
                     logger.info("Token refreshed successfully")
-            else:
-                logger.debug(f"Token still valid, expires at: {self.token_expiry}")
         except Exception as e:
             logger.error(f"Failed to refresh token: {str(e)}")
             logger.error(traceback.format_exc())
             raise
     
-    def _prepare_context(self, analysis: Dict, metrics: Dict) -> Dict:
-        context = {
-            'sla_breach': analysis['sla_status']['breached'] if analysis['sla_status'] else False,
-            'processing_duration': analysis['processing_duration'],
-            'root_causes': [],
-            'timeline_events': [],
-            'critical_metrics': [],
-            'processing_window': {
-                'start': analysis['sla_status'].get('arrival_time') if analysis.get('sla_status') else None,
-                'end': analysis['sla_status'].get('completion_time') if analysis.get('sla_status') else None
-            }
-        }
-        
-        for cause in analysis.get('root_causes', []):
-            context['root_causes'].append({
-                'category': cause['category'],
-                'cause': cause['cause'],
-                'impact': cause['impact']
-            })
-        
-        # Use filtered timeline events which already contain only relevant time-window data
-        critical_events = [e for e in analysis.get('timeline', []) if e['severity'] in ['critical', 'warning']]
-        for event in critical_events[:10]:  # Include more events for better context
-            context['timeline_events'].append({
-                'time': self._format_time(event['timestamp']),
-                'event': event['event'],
-                'details': event['details'],
-                'severity': event['severity']
-            })
-        
-        # Extract critical metrics from the timeline (already filtered by time window)
-        for event in analysis.get('timeline', []):
-            if 'RDS' in event.get('event', '') and event['severity'] == 'critical':
-                if 'latency' in event['details'].lower():
-                    context['critical_metrics'].append({
-                        'service': 'RDS',
-                        'issue': event['details'],
-                        'time': self._format_time(event['timestamp'])
-                    })
-            elif 'SQS' in event.get('event', '') and event['severity'] == 'critical':
-                if 'queue' in event['details'].lower():
-                    context['critical_metrics'].append({
-                        'service': 'SQS', 
-                        'issue': event['details'],
-                        'time': self._format_time(event['timestamp'])
-                    })
-            elif 'EKS' in event.get('event', '') and event['severity'] == 'critical':
-                context['critical_metrics'].append({
-                    'service': 'EKS',
-                    'issue': event['details'],
-                    'time': self._format_time(event['timestamp'])
-                })
-        
-        return context
-    
-    def _create_prompt(self, context: Dict, user_query: str, analysis: Dict) -> str:
-        # Count infrastructure issues for better context
-        infra_summary = {}
-        for metric in context['critical_metrics']:
-            service = metric.get('service', 'Unknown')
-            if service not in infra_summary:
-                infra_summary[service] = 0
-            infra_summary[service] += 1
-        
-        prompt = f"""
-The user is asking: "{user_query}"
-
-Please answer their specific question using the following context about derivatives batch processing:
-
-ANALYSIS RESULTS:
-- SLA Status: {'BREACHED' if context['sla_breach'] else 'MET'}
-- Processing Duration: {context['processing_duration']} hours (SLA: 3 hours)
-- Date: {analysis.get('date', 'Unknown')}
-- Processing Window: {self._format_time(context['processing_window']['start']) if context['processing_window']['start'] else 'N/A'} to {self._format_time(context['processing_window']['end']) if context['processing_window']['end'] else 'N/A'}
-
-ROOT CAUSES IDENTIFIED:
-{self._format_root_causes(context['root_causes'])}
-
-DETAILED TIMELINE ANALYSIS FOR DERIVATIVES:
-{self._format_timeline_events(context['timeline_events'])}
-
-INFRASTRUCTURE ISSUES (detected during processing):
-{self._format_critical_metrics(context['critical_metrics'])}
-Summary: {', '.join([f'{service}: {count} issues' for service, count in infra_summary.items()]) if infra_summary else 'No critical infrastructure issues detected'}
-
-RECOMMENDATIONS:
-{self._format_recommendations(analysis.get('recommendations', []))}
-
-Remember: 
-- Focus on answering the user's specific question
-- ALWAYS include the Detailed Timeline Analysis when discussing processing issues
-- Show the cascading failure pattern with proper formatting
-- When discussing infrastructure issues, be specific about which services had problems and when they occurred
-- Use the timeline format with visual hierarchy (|, ├, └) to show relationships
-"""
-        return prompt
+    def _start_background_refresh(self):
+        """Fetch the next token on a daemon thread, unless a background refresh is already running"""
+        with self._background_refresh_lock:
+            if self._background_refresh:
+                return
+            self._background_refresh = True
+            # A successful refresh moves this to the new token's window; after a failure
+            # the next background attempt waits a little instead of starting on every request
+            self.token_refresh_on = time.time() + TOKEN_BACKGROUND_RETRY_SECONDS
+        logger.info("Token nearing expiry, refreshing in the background")
+        threading.Thread(target=self._refresh_token_in_background, name='aad-token-refresh', daemon=True).start()
     
-    def _get_system_prompt(self) -> str:
-        return """You are an expert Site Reliability Engineer specializing in batch processing systems and root cause analysis.
-        You analyze complex distributed system failures involving AWS services (RDS, EKS, SQS) and provide clear, actionable insights.
-        
-        IMPORTANT: 
-        - Answer the user's specific question directly
-        - If they ask about something other than RCA/processing, respond appropriately
-        - Don't always provide full RCA analysis unless specifically asked
-        - Be conversational and helpful, not repetitive
-        - Focus on what the user actually wants to know
-        - When showing timelines, use the formatted timeline provided in the context
-        - Explain the cascading failure pattern when relevant"""
-    
-    def _generate_fallback_response(self, analysis: Dict, user_query: str) -> str:
-        if not analysis or not analysis.get('sla_status'):
-            return "Unable to perform analysis. Please check if metrics are available for the specified date."
-        
-        response = f"## Root Cause Analysis for Derivatives Processing\n\n"
-        
-        if analysis['sla_status'].get('breached'):
-            response += f"**SLA Status:** ⚠️ BREACHED\n"
-            response += f"**Processing Duration:** {analysis['processing_duration']} hours (exceeded 3-hour SLA by {analysis['sla_status']['excess_hours']} hours)\n\n"
-            
-            response += "### Primary Root Causes:\n"
-            for i, cause in enumerate(analysis.get('root_causes', []), 1):
-                response += f"{i}. **{cause['category']}**: {cause['cause']}\n"
-                response += f"   - Impact: {cause['impact']}\n"
-                if cause.get('evidence'):
-                    response += f"   - Evidence: {cause['evidence']}\n"
-            
-            response += "\n### Detailed Timeline Analysis for Derivatives:\n\n"
-            response += "The Cascading Failure Pattern:\n\n"
-            all_timeline = analysis.get('timeline', [])
-            # Sort timeline events in ascending order
-            sorted_timeline = sorted(all_timeline, key=lambda x: x.get('timestamp', ''))
-            critical_events = [e for e in sorted_timeline if e['severity'] in ['critical', 'warning']]
-            for event in critical_events[:10]:
-                time = self._format_time(event['timestamp'])
-                event_name = event['event']
-                details = event['details']
-                
-                response += f"**{time}** | {event_name}\n"
-                if 'marker' in event_name.lower():
-                    response += f"        | {details}\n"
-                    response += f"        └ Upstream system delay\n"
-                elif 'rds' in event_name.upper() or 'database' in event_name.lower():
-                    response += f"        ├ {details}\n"
-                    if event['severity'] == 'critical':
-                        response += f"        └ Database bottleneck from concurrent processing\n"
-                elif 'sqs' in event_name.upper():
-                    response += f"        ├ {details}\n"
-                    response += f"        └ Queue backup from slow processing\n"
-                else:
-                    response += f"        └ {details}\n"
-                response += "\n"
-            
-            response += "\n### Recommendations:\n"
-            for rec in analysis.get('recommendations', [])[:5]:
-                response += f"- {rec}\n"
-        else:
-            response += f"**SLA Status:** ✅ MET\n"
-            response += f"**Processing Duration:** {analysis['processing_duration']} hours (within 3-hour SLA)\n\n"
-            response += "Processing completed successfully within SLA requirements.\n"
-        
-        return response
-    
-    def _format_time(self, timestamp: str) -> str:
+    def _refresh_token_in_background(self):
         try:
-            dt = datetime.fromisoformat(timestamp.replace('Z', '+00:00'))
-            return dt.strftime('%I:%M %p')
-        except:
-            return timestamp
-    
-    def _format_root_causes(self, causes: List[Dict]) -> str:
-        if not causes:
-            return "No specific root causes identified"
-        
-        formatted = []
-        for cause in causes:
-            formatted.append(f"- {cause['category']}: {cause['cause']} ({cause['impact']})")
-        return '\n'.join(formatted)
-    
-    def _format_timeline_events(self, events: List[Dict]) -> str:
-        if not events:
-            return "No critical events recorded"
-        
-        formatted = ["\nThe Cascading Failure Pattern:\n"]
-        
-        # Sort events by timestamp in ascending order
-        sorted_events = sorted(events, key=lambda x: x.get('timestamp', ''))
-        
-        for i, event in enumerate(sorted_events):
-            time_str = event['time']
-            event_name = event['event']
-            details = event['details']
-            severity = event.get('severity', 'info')
-            
-            # Main event line
-            if severity == 'critical':
-                formatted.append(f"{time_str} | {event_name} (Critical Issue)")
-            elif severity == 'warning':
-                formatted.append(f"{time_str} | {event_name}")
-            else:
-                formatted.append(f"{time_str} | {event_name}")
-            
-            # Details with proper indentation
-            if 'marker' in event_name.lower() and 'delayed' in details.lower():
-                formatted.append(f"        | {details}")
-                formatted.append(f"        └ Upstream system issue")
-            elif 'dag' in event_name.lower() and 'start' in event_name.lower():
-                formatted.append(f"        └ {details}")
-            elif 'rds' in event_name.upper() or 'database' in event_name.lower():
-                formatted.append(f"        ├ {details}")
-                if 'critical' in str(severity):
-                    formatted.append(f"        └ Caused by: High concurrent queries + delayed processing")
-            elif 'sqs' in event_name.upper() or 'queue' in event_name.lower():
-                formatted.append(f"        ├ {details}")
-                formatted.append(f"        └ Queue backup caused by slow processing")
-            elif 'eks' in event_name.upper():
-                formatted.append(f"        ├ {details}")
-                formatted.append(f"        └ Resource strain from delayed batch processing")
-            elif 'complete' in event_name.lower():
-                formatted.append(f"        └ {details}")
-            else:
-                formatted.append(f"        └ {details}")
-            
-            formatted.append("")  # Empty line between events
-        
-        return '\n'.join(formatted)
+            self._refresh_token_if_needed(force=True)
+        except Exception:
+            # Already logged; requests refresh inline once the token actually expires
+            pass
+        finally:
+            self._background_refresh = False
     
     def _format_critical_metrics(self, metrics: List[Dict]) -> str:
         if not metrics:
             return "No critical infrastructure issues detected"
 
-        formatted = []
-        for metric in metrics:
-            formatted.append(f"- {metric['service']} at {metric['time']}: {metric['issue']}")
-        return '\n'.join(formatted)
-
-    def analyze_failure_logs(self, log_content: str) -> Dict:
-        """
-        Use LLM to analyze failure logs and provide insights.
-        Returns a structured analysis with root cause, suggestions, and patterns.
-        """
-        if not self.client:
-            return self._generate_fallback_log_analysis(log_content)
-
-        try:
-            # Refresh token if needed before making the API call
-            self._refresh_token_if_needed()
-            
-            prompt = f"""Analyze the following application failure logs and provide a detailed technical analysis.
-
-{log_content}
-
-Please provide your analysis in the following JSON format (respond ONLY with valid JSON, no markdown):
-{{
-    "root_cause": "A clear, concise explanation of the root cause of the failure",
-    "error_chain": ["Step 1 of how the error propagated", "Step 2...", "Step 3..."],
-    "affected_components": ["component1", "component2"],
-    "suggested_fixes": [
-        {{
-            "priority": "high|medium|low",
-            "action": "Specific action to take",
-            "rationale": "Why this fix will help"
-        }}
-    ],
-    "patterns_detected": ["Pattern 1 noticed in the logs", "Pattern 2..."],
-    "severity_assessment": "critical|high|medium|low",
-    "summary": "A 2-3 sentence executive summary of the failure and recommended immediate action"
-}}
-"""
-
-            response = self.client.chat.completions.create(
-                model=self.deployment,
-                messages=[
-                    {"role": "system", "content": """You are an expert DevOps engineer and log analyst.
-Analyze application logs to identify root causes, patterns, and provide actionable recommendations.
-Focus on:
-1. Identifying the primary root cause
-2. Understanding the error propagation chain
-3. Suggesting specific, actionable fixes
-4. Detecting patterns that might indicate systemic issues
-Always respond with valid JSON only, no markdown formatting."""},
-                    {"role": "user", "content": prompt}
-                ],
-                temperature=0.3,
-                max_tokens=1500
-            )
-
-            response_text = response.choices[0].message.content.strip()
-
-            # Try to parse JSON response
-            import json
-            try:
-                # Remove markdown code blocks if present
-                if response_text.startswith('```'):
-                    response_text = response_text.split('```')[1]
-                    if response_text.startswith('json'):
-                        response_text = response_text[4:]
-                analysis = json.loads(response_text)
-                return analysis
-            except json.JSONDecodeError:
-                logger.warning("Failed to parse LLM response as JSON, returning as summary")
-                return {
-                    "root_cause": "Analysis completed",
-                    "summary": response_text,
-                    "error_chain": [],
-                    "affected_components": [],
-                    "suggested_fixes": [],
-                    "patterns_detected": [],
-                    "severity_assessment": "medium"
-                }
-
-        except Exception as e:
-            logger.error(f"Error analyzing logs with LLM: {str(e)}")
-            logger.error(traceback.format_exc())
-            
-            # Try to reinitialize the client and retry once
-            if "401" in str(e) or "unauthorized" in str(e).lower() or "token" in str(e).lower():
-                try:
-                    logger.info("Token error detected, reinitializing client and retrying...")
-                    self._initialize_client()
-                    
-                    response = self.client.chat.completions.create(
-                        model=self.deployment,
-                        messages=[
-                            {"role": "system", "content": """You are an expert DevOps engineer and log analyst.
-Analyze application logs to identify root causes, patterns, and provide actionable recommendations.
-Focus on:
-1. Identifying the primary root cause
-2. Understanding the error propagation chain
-3. Suggesting specific, actionable fixes
-4. Detecting patterns that might indicate systemic issues
-Always respond with valid JSON only, no markdown formatting."""},
-                            {"role": "user", "content": prompt}
-                        ],
-                        temperature=0.3,
-                        max_tokens=1500
-                    )
-                    
-                    response_text = response.choices[0].message.content.strip()
-                    
-                    # Try to parse JSON response
-                    import json
-                    try:
-                        if response_text.startswith('```'):
-                            response_text = response_text.split('```')[1]
-                            if response_text.startswith('json'):
-                                response_text = response_text[4:]
-                        analysis = json.loads(response_text)
-                        return analysis
-                    except json.JSONDecodeError:
-                        logger.warning("Failed to parse LLM response as JSON on retry, returning as summary")
-                        return {
-                            "root_cause": "Analysis completed",
-                            "summary": response_text,
-                            "error_chain": [],
-                            "affected_components": [],
-                            "suggested_fixes": [],
-                            "patterns_detected": [],
-                            "severity_assessment": "medium"
-                        }
-                except Exception as retry_error:
-                    logger.error(f"Retry also failed: {str(retry_error)}")
-            
-            return self._generate_fallback_log_analysis(log_content)
-
-    def _generate_fallback_log_analysis(self, log_content: str) -> Dict:
-        """Generate a basic analysis when LLM is not available."""
-        # Count errors and warnings from content
-        error_count = log_content.lower().count('error')
-        warning_count = log_content.lower().count('warn')
-
-        severity = "critical" if error_count > 5 else "high" if error_count > 2 else "medium"
-
-        return {
-            "root_cause": "Unable to perform AI analysis - LLM service unavailable",
-            "summary": f"Log file contains {error_count} error(s) and {warning_count} warning(s). Manual review recommended.",
-            "error_chain": [],
-            "affected_components": [],
-            "suggested_fixes": [
-                {
-                    "priority": "high",
-                    "action": "Review the error contexts manually",
-                    "rationale": "AI analysis unavailable, manual investigation required"
-                }
-            ],
-            "patterns_detected": [],
-            "severity_assessment": severity
-        }
-
-    def _format_recommendations(self, recommendations: List[str]) -> str:
-        if not recommendations:
-            return "No specific recommendations"
-        
-        formatted = []
-        for i, rec in enumerate(recommendations[:5], 1):
-            formatted.append(f"{i}. {rec}")
-        return '\n'.join(formatted)
\ No newline at end of file
+        return '\n'.join(f"- {metric['service']} at {metric['time']}: {metric['issue']}" for metric in metrics)
@@ -0,0 +1,60 @@
+import time
+from typing import Callable, Dict, List, Optional
+import logging
+import orjson
+
+logger = logging.getLogger(__name__)
+
+TERMINAL_BATCH_STATUSES = {'completed', 'failed', 'expired', 'cancelled'}
+
+
+def run_batch(client, deployment: str, bodies: List[Dict], poll_interval: float = 30,
+              timeout: float = 24 * 3600, on_poll: Optional[Callable[[], None]] = None) -> List[Optional[str]]:
+    """
+    Submit chat completion bodies as one Azure OpenAI Batch API job and wait for it.
+    Returns the message content per body, in input order (None for requests that failed).
+    on_poll runs before every status check, e.g. to refresh an expiring token.
+    """
+    lines = [
+        orjson.dumps({
+            'custom_id': str(i),
+            'method': 'POST',
+            'url': '/chat/completions',
+            'body': {'model': deployment, **body}
+        })
+        for i, body in enumerate(bodies)
+    ]
+    batch_file = client.files.create(file=('rca_batch.jsonl', b'\n'.join(lines)), purpose='batch')
+    batch = client.batches.create(
+        input_file_id=batch_file.id,
+        endpoint='/chat/completions',
+        completion_window='24h'
+    )
+    logger.info(f"Submitted batch {batch.id} with {len(bodies)} request(s)")
+
+    deadline = time.monotonic() + timeout
+    while batch.status not in TERMINAL_BATCH_STATUSES:
+        if time.monotonic() >= deadline:
+            raise TimeoutError(f"Batch {batch.id} did not finish within {timeout} seconds")
+        time.sleep(poll_interval)
+        if on_poll is not None:
+            on_poll()
+        batch = client.batches.retrieve(batch.id)
+        logger.debug(f"Batch {batch.id} status: {batch.status}")
+
+    if batch.status != 'completed' or not batch.output_file_id:
+        raise RuntimeError(f"Batch {batch.id} ended with status {batch.status}")
+
+    results: List[Optional[str]] = [None] * len(bodies)
+    for line in client.files.content(batch.output_file_id).content.splitlines():
+        if not line.strip():
+            continue
+        record = orjson.loads(line)
+        response = record.get('response') or {}
+        if response.get('status_code') == 200:
+            results[int(record['custom_id'])] = response['body']['choices'][0]['message']['content']
+        else:
+            logger.warning(f"Batch request {record.get('custom_id')} failed: {record.get('error')}")
+
+    logger.info(f"Batch {batch.id} completed ({sum(r is not None for r in results)}/{len(bodies)} succeeded)")
+    return results
@@ -0,0 +1,33 @@
+import os
+from functools import lru_cache
+import logging
+import httpx
+from openai import DefaultHttpxClient
+
+logger = logging.getLogger(__name__)
+
+
+@lru_cache(maxsize=1)
+def get_shared_http_client() -> httpx.Client:
+    """
+    Return the process-wide HTTP client used for Azure OpenAI calls.
+    Sharing one keep-alive pool means TCP/TLS setup is paid once, not on every
+    request or every client rebuild, and HTTP/2 lets concurrent calls multiplex
+    over a single connection.
+    """
+    http2 = os.getenv('AZURE_OPENAI_HTTP2', 'true').lower() == 'true'
+    limits = httpx.Limits(
+        max_connections=int(os.getenv('AZURE_OPENAI_MAX_CONNECTIONS', 64)),
+        max_keepalive_connections=int(os.getenv('AZURE_OPENAI_MAX_KEEPALIVE', 16)),
+        keepalive_expiry=60
+    )
+    logger.info(f"Creating shared HTTP client for Azure OpenAI (http2={http2})")
+    return DefaultHttpxClient(http2=http2, limits=limits)
+
+
+def close_shared_http_client():
+    """Close the shared client's pooled connections, if it was ever created"""
+    if get_shared_http_client.cache_info().currsize:
+        get_shared_http_client().close()
+        get_shared_http_client.cache_clear()
+        logger.info("Closed shared HTTP client for Azure OpenAI")
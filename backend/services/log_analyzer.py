@@ -1,31 +1,39 @@
 import gzip
 import os
 import re
-from typing import Dict, List, Optional
+from collections import deque
+from typing import Dict, Iterable, Iterator, List, Optional
 import logging
 
 logger = logging.getLogger(__name__)
 
+# Compiled once for the module; the scan runs them against every line of a log.
+# One alternation per line instead of a search per pattern: the first group captures
+# ERROR/EXCEPTION, anything else matched is a warning level
+LEVEL_RE = re.compile(r'\b(?:(ERROR|EXCEPTION)|WARN(?:ING)?|CRITICAL|FATAL)\b', re.IGNORECASE)
+STACK_TRACE_RE = re.compile(r'^\s+at\s+|Traceback|File ".*", line \d+', re.IGNORECASE)
+# Prefixes stripped from a line to get its message
+LEADING_TIMESTAMP_RE = re.compile(r'^\d{4}-\d{2}-\d{2}[\sT]\d{2}:\d{2}:\d{2}[.,]?\d*\s*')
+LEADING_LEVEL_RE = re.compile(r'^(INFO|DEBUG|WARN|WARNING|ERROR|CRITICAL|FATAL)\s*[-:]\s*', re.IGNORECASE)
+# Level words and trace markers are only looked for in the first this many characters of
+# a line, so embedded JSON/base64 payloads do not cost a full case-insensitive scan each
+MAX_SCAN_LINE_CHARS = 8192
+# Common timestamp formats, tried in order
+TIMESTAMP_RES = (
+    re.compile(r'(\d{4}-\d{2}-\d{2}[\sT]\d{2}:\d{2}:\d{2}[.,]?\d*)'),
+    re.compile(r'(\d{2}/\d{2}/\d{4}\s+\d{2}:\d{2}:\d{2})'),
+)
+
 
 class LogAnalyzer:
     def __init__(self, base_path: str = None):
         self.base_path = base_path or os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
         self.log_folder = 'failed_dag_log'
         self.context_lines = 10  # Lines before and after ERROR/EXCEPTION
-        self.error_patterns = [
-            re.compile(r'\bERROR\b', re.IGNORECASE),
-            re.compile(r'\bEXCEPTION\b', re.IGNORECASE),
-        ]
-        self.warning_patterns = [
-            re.compile(r'\bWARN(?:ING)?\b', re.IGNORECASE),
-            re.compile(r'\bCRITICAL\b', re.IGNORECASE),
-            re.compile(r'\bFATAL\b', re.IGNORECASE),
-        ]
-        self.stack_trace_patterns = [
-            re.compile(r'^\s+at\s+', re.IGNORECASE),
-            re.compile(r'Traceback', re.IGNORECASE),
-            re.compile(r'File ".*", line \d+', re.IGNORECASE),
-        ]
+        # Only the first entries of each kind are reported; the scan stops building more
+        self.max_error_contexts = 5
+        self.max_stack_traces = 3
+        self.max_timeline_events = 20
 
     def load_failure_logs(self, date: str) -> Dict:
         """
@@ -72,31 +80,24 @@ class LogAnalyzer:
         result['file_path'] = log_file_path
 
         try:
-            lines = self._read_log_file(log_file_path, is_gzip)
-            if not lines:
+            scan = self._scan_log(self._iter_log_lines(log_file_path, is_gzip))
+            if not scan['total_lines']:
                 result['summary'] = "Log file is empty"
                 return result
 
             result['available'] = True
-            result['log_metadata']['total_lines'] = len(lines)
+            result['log_metadata']['total_lines'] = scan['total_lines']
 
             # Extract timestamps from first and last lines
-            result['log_metadata']['first_timestamp'] = self._extract_timestamp(lines[0]) if lines else None
-            result['log_metadata']['last_timestamp'] = self._extract_timestamp(lines[-1]) if lines else None
+            result['log_metadata']['first_timestamp'] = self._extract_timestamp(scan['first_line'])
+            result['log_metadata']['last_timestamp'] = self._extract_timestamp(scan['last_line'])
 
-            # Extract error contexts
-            error_contexts = self._extract_error_contexts(lines)
+            error_contexts = scan['error_contexts']
             result['error_contexts'] = error_contexts
             result['total_errors_found'] = len(error_contexts)
-
-            # Extract warnings count
-            result['warnings_found'] = self._count_warnings(lines)
-
-            # Extract stack traces
-            result['stack_traces'] = self._extract_stack_traces(lines)
-
-            # Build error timeline
-            result['log_metadata']['error_timeline'] = self._build_error_timeline(lines)
+            result['warnings_found'] = scan['warnings_found']
+            result['stack_traces'] = scan['stack_traces']
+            result['log_metadata']['error_timeline'] = scan['error_timeline']
 
             if error_contexts:
                 result['summary'] = self._generate_summary(error_contexts)
@@ -111,79 +112,174 @@ class LogAnalyzer:
             result['summary'] = f"Error reading log file: {str(e)}"
             return result
 
-    def _read_log_file(self, file_path: str, is_gzip: bool = False) -> List[str]:
-        """Read a log file (gzip or plain text), returning lines."""
-        lines = []
-        try:
-            if is_gzip:
-                with gzip.open(file_path, 'rt', encoding='utf-8', errors='replace') as f:
-                    lines = f.readlines()
-            else:
-                with open(file_path, 'r', encoding='utf-8', errors='replace') as f:
-                    lines = f.readlines()
-        except Exception as e:
-            logger.error(f"Error reading file: {str(e)}")
-            raise
-        return lines
+    def _iter_log_lines(self, file_path: str, is_gzip: bool = False) -> Iterator[str]:
+        """Yield the lines of a log file (gzip or plain text) one at a time, without reading it whole."""
+        opener = gzip.open if is_gzip else open
+        with opener(file_path, 'rt', encoding='utf-8', errors='replace') as f:
+            yield from f
 
-    def _extract_error_contexts(self, lines: List[str]) -> List[Dict]:
+    def _scan_log(self, lines: Iterable[str]) -> Dict:
         """
-        Find ERROR/EXCEPTION patterns and extract surrounding context.
-        Returns list of error contexts with line numbers and content.
+        Collect error contexts, the warning count, stack traces and the error timeline
+        in a single pass over the log. Only the last context_lines lines are kept around,
+        for the context before an error; lines after it are added as they stream past.
         """
         error_contexts = []
-        total_lines = len(lines)
-        processed_ranges = set()  # Track processed line ranges to avoid duplicates
+        stack_traces = []
+        error_timeline = []
+        warnings_found = 0
+        total_lines = 0
+        first_line = last_line = None
+
+        before = deque(maxlen=self.context_lines)
+        pending_context = None  # Context lines of the latest error, still collecting lines after it
+        pending_after = 0
+        last_end = -1  # Exclusive end of the latest context window; overlapping errors are skipped
+
+        current_trace = []
+        in_trace = False
+        long_lines = 0
 
         for i, line in enumerate(lines):
-            # Check if line matches any error pattern
-            is_error_line = any(pattern.search(line) for pattern in self.error_patterns)
-
-            if is_error_line:
-                # Calculate context range
-                start_idx = max(0, i - self.context_lines)
-                end_idx = min(total_lines, i + self.context_lines + 1)
-
-                # Create a key for this range to avoid duplicates
-                range_key = (start_idx, end_idx)
-
-                # Check if this range overlaps with already processed ranges
-                is_overlap = False
-                for processed_start, processed_end in processed_ranges:
-                    if start_idx <= processed_end and end_idx >= processed_start:
-                        is_overlap = True
+            if first_line is None:
+                first_line = line
+            last_line = line
+            total_lines = i + 1
+
+            # Matching looks at the head of oversized lines; contexts still show them whole
+            scanned = line
+            if len(line) > MAX_SCAN_LINE_CHARS:
+                scanned = line[:MAX_SCAN_LINE_CHARS]
+                long_lines += 1
+
+            # Each line is classified once; every collector below reuses the result
+            # Cheap substring screen first: most lines name no level and skip the regexes.
+            # Only ASCII lines are screened, since IGNORECASE also matches a few non-ASCII
+            # letters (e.g. a dotless i) that lower() does not map back to ASCII.
+            if scanned.isascii():
+                lowered = scanned.lower()
+                maybe_level = ('error' in lowered or 'exception' in lowered or 'warn' in lowered
+                               or 'critical' in lowered or 'fatal' in lowered)
+                maybe_trace = scanned[:1].isspace() or 'traceback' in lowered or 'file "' in lowered
+            else:
+                maybe_level = maybe_trace = True
+
+            is_error = is_warning = False
+            match = LEVEL_RE.search(scanned) if maybe_level else None
+            if match is not None:
+                # A line can carry both kinds (e.g. "WARN ... Exception"), so keep looking
+                for match in LEVEL_RE.finditer(scanned, match.start()):
+                    if match.group(1):
+                        is_error = True
+                    else:
+                        is_warning = True
+                    if is_error and is_warning:
                         break
+            is_trace_line = maybe_trace and STACK_TRACE_RE.search(scanned) is not None
+            message = None
 
-                if not is_overlap:
-                    processed_ranges.add(range_key)
-
-                    context_lines = []
-                    for j in range(start_idx, end_idx):
-                        context_lines.append({
-                            'line_number': j + 1,
-                            'content': lines[j].rstrip(),
-                            'is_error_line': j == i
+            # Error contexts with surrounding lines
+            if pending_context is not None:
+                pending_context.append({
+                    'line_number': i + 1,
+                    'content': line.rstrip(),
+                    'is_error_line': False
+                })
+                pending_after -= 1
+                if not pending_after:
+                    pending_context = None
+            elif (is_error and len(error_contexts) < self.max_error_contexts
+                  and max(0, i - self.context_lines) > last_end):
+                message = self._extract_error_message(line)
+                first_number = i - len(before) + 1
+                context_lines = [
+                    {'line_number': first_number + j, 'content': previous.rstrip(), 'is_error_line': False}
+                    for j, previous in enumerate(before)
+                ]
+                context_lines.append({'line_number': i + 1, 'content': line.rstrip(), 'is_error_line': True})
+                error_contexts.append({
+                    'error_line_number': i + 1,
+                    'error_message': message,
+                    'context': context_lines,
+                    'error_type': self._classify_error(line)
+                })
+                last_end = i + self.context_lines + 1
+                if self.context_lines:
+                    pending_context = context_lines
+                    pending_after = self.context_lines
+            before.append(line)
+
+            if is_warning:
+                warnings_found += 1
+
+            # Stack trace blocks
+            if len(stack_traces) < self.max_stack_traces:
+                if is_error or (is_trace_line and not in_trace):
+                    if current_trace:
+                        stack_traces.append({
+                            'start_line': current_trace[0]['line_number'],
+                            'lines': current_trace
                         })
+                    current_trace = []
+                    in_trace = True
+
+                if in_trace:
+                    stripped = line.strip()
+                    if is_trace_line or is_error or stripped.startswith('at '):
+                        current_trace.append({
+                            'line_number': i + 1,
+                            'content': line.rstrip()
+                        })
+                    elif current_trace and not stripped:
+                        # Empty line might continue trace
+                        pass
+                    else:
+                        # End of trace
+                        if current_trace:
+                            stack_traces.append({
+                                'start_line': current_trace[0]['line_number'],
+                                'lines': current_trace
+                            })
+                        current_trace = []
+                        in_trace = False
+
+            # Timeline of errors and warnings
+            if (is_error or is_warning) and len(error_timeline) < self.max_timeline_events:
+                if message is None:
+                    message = self._extract_error_message(line)
+                error_timeline.append({
+                    'line_number': i + 1,
+                    'timestamp': self._extract_timestamp(line),
+                    'level': 'error' if is_error else 'warning',
+                    'message': message[:200]
+                })
 
-                    # Extract the main error message
-                    error_message = self._extract_error_message(line)
-
-                    error_contexts.append({
-                        'error_line_number': i + 1,
-                        'error_message': error_message,
-                        'context': context_lines,
-                        'error_type': self._classify_error(line)
-                    })
+        # Don't forget the last trace
+        if current_trace and len(stack_traces) < self.max_stack_traces:
+            stack_traces.append({
+                'start_line': current_trace[0]['line_number'],
+                'lines': current_trace
+            })
 
-        # Limit to most relevant errors (first 5 unique contexts)
-        return error_contexts[:5]
+        if long_lines:
+            logger.info(f"{long_lines} line(s) longer than {MAX_SCAN_LINE_CHARS} characters were matched on their first {MAX_SCAN_LINE_CHARS} only")
+
+        return {
+            'total_lines': total_lines,
+            'first_line': first_line,
+            'last_line': last_line,
+            'error_contexts': error_contexts,
+            'warnings_found': warnings_found,
+            'stack_traces': stack_traces,
+            'error_timeline': error_timeline
+        }
 
     def _extract_error_message(self, line: str) -> str:
         """Extract the main error message from a log line."""
         # Remove timestamp patterns at the beginning
-        cleaned = re.sub(r'^\d{4}-\d{2}-\d{2}[\sT]\d{2}:\d{2}:\d{2}[.,]?\d*\s*', '', line)
+        cleaned = LEADING_TIMESTAMP_RE.sub('', line)
         # Remove common log prefixes
-        cleaned = re.sub(r'^(INFO|DEBUG|WARN|WARNING|ERROR|CRITICAL|FATAL)\s*[-:]\s*', '', cleaned, flags=re.IGNORECASE)
+        cleaned = LEADING_LEVEL_RE.sub('', cleaned)
         return cleaned.strip()[:500]  # Limit length
 
     def _classify_error(self, line: str) -> str:
@@ -238,91 +334,12 @@ class LogAnalyzer:
 
     def _extract_timestamp(self, line: str) -> Optional[str]:
         """Extract timestamp from a log line."""
-        # Match common timestamp formats
-        patterns = [
-            r'(\d{4}-\d{2}-\d{2}[\sT]\d{2}:\d{2}:\d{2}[.,]?\d*)',
-            r'(\d{2}/\d{2}/\d{4}\s+\d{2}:\d{2}:\d{2})',
-        ]
-        for pattern in patterns:
-            match = re.search(pattern, line)
+        for pattern in TIMESTAMP_RES:
+            match = pattern.search(line)
             if match:
                 return match.group(1)
         return None
 
-    def _count_warnings(self, lines: List[str]) -> int:
-        """Count warning lines in the log."""
-        count = 0
-        for line in lines:
-            if any(pattern.search(line) for pattern in self.warning_patterns):
-                count += 1
-        return count
-
-    def _extract_stack_traces(self, lines: List[str]) -> List[Dict]:
-        """Extract stack trace blocks from the log."""
-        stack_traces = []
-        current_trace = []
-        in_trace = False
-
-        for i, line in enumerate(lines):
-            is_trace_line = any(pattern.search(line) for pattern in self.stack_trace_patterns)
-            is_error_line = any(pattern.search(line) for pattern in self.error_patterns)
-
-            if is_error_line or (is_trace_line and not in_trace):
-                if current_trace:
-                    stack_traces.append({
-                        'start_line': current_trace[0]['line_number'],
-                        'lines': current_trace
-                    })
-                current_trace = []
-                in_trace = True
-
-            if in_trace:
-                if is_trace_line or is_error_line or line.strip().startswith('at '):
-                    current_trace.append({
-                        'line_number': i + 1,
-                        'content': line.rstrip()
-                    })
-                elif current_trace and not line.strip():
-                    # Empty line might continue trace
-                    pass
-                else:
-                    # End of trace
-                    if current_trace:
-                        stack_traces.append({
-                            'start_line': current_trace[0]['line_number'],
-                            'lines': current_trace
-                        })
-                    current_trace = []
-                    in_trace = False
-
-        # Don't forget the last trace
-        if current_trace:
-            stack_traces.append({
-                'start_line': current_trace[0]['line_number'],
-                'lines': current_trace
-            })
-
-        return stack_traces[:3]  # Limit to first 3 stack traces
-
-    def _build_error_timeline(self, lines: List[str]) -> List[Dict]:
-        """Build a timeline of errors and warnings."""
-        timeline = []
-
-        for i, line in enumerate(lines):
-            timestamp = self._extract_timestamp(line)
-            is_error = any(pattern.search(line) for pattern in self.error_patterns)
-            is_warning = any(pattern.search(line) for pattern in self.warning_patterns)
-
-            if is_error or is_warning:
-                timeline.append({
-                    'line_number': i + 1,
-                    'timestamp': timestamp,
-                    'level': 'error' if is_error else 'warning',
-                    'message': self._extract_error_message(line)[:200]
-                })
-
-        return timeline[:20]  # Limit to first 20 events
-
     def get_log_content_for_llm(self, failure_logs: Dict) -> str:
         """
         Prepare log content for LLM analysis.
@@ -361,9 +378,10 @@ class LogAnalyzer:
                 parts.append(f"\n--- Error #{i}: {ctx.get('error_type', 'Unknown')} (Line {ctx.get('error_line_number', 'N/A')}) ---")
                 parts.append(f"Error message: {ctx.get('error_message', 'N/A')}")
                 parts.append("\nContext (surrounding lines):")
-                for line_info in ctx.get('context', []):
-                    prefix = ">>>" if line_info.get('is_error_line') else "   "
-                    parts.append(f"{prefix} {line_info.get('line_number', '')}: {line_info.get('content', '')}")
+                parts.extend(
+                    f"{'>>>' if line_info['is_error_line'] else '   '} {line_info['line_number']}: {line_info['content']}"
+                    for line_info in ctx.get('context', [])
+                )
             parts.append("")
 
         # Add stack traces
@@ -372,8 +390,7 @@ class LogAnalyzer:
             parts.append("=== STACK TRACES ===")
             for i, trace in enumerate(stack_traces, 1):
                 parts.append(f"\n--- Stack Trace #{i} ---")
-                for line_info in trace.get('lines', []):
-                    parts.append(f"  {line_info.get('content', '')}")
+                parts.extend(f"  {line_info['content']}" for line_info in trace.get('lines', []))
             parts.append("")
 
         return "\n".join(parts)
@@ -1,8 +1,9 @@
-import json
 import os
+import threading
 from typing import Dict, List, Any, Optional
 from datetime import datetime
 import logging
+import orjson
 
 logger = logging.getLogger(__name__)
 
@@ -17,8 +18,37 @@ class MetricLoader:
             'sqsMetrics': 'sqs_metrics',
             'rdsMetrics': 'rds_metrics'
         }
+        # Metric files are immutable once written, so parsed metrics are kept in memory per date
+        self._cache: Dict[str, Dict[str, Any]] = {}
+        self._cache_lock = threading.Lock()
+    
+    def preload(self) -> int:
+        """Load every available date into memory, returning the number of dates loaded"""
+        loaded = 0
+        for date in self.get_available_dates():
+            if self.load_all_metrics(date):
+                loaded += 1
+        logger.info(f"Preloaded metrics for {loaded} date(s)")
+        return loaded
+    
+    def clear_cache(self):
+        """Drop all in-memory metrics so the next load re-reads the files"""
+        with self._cache_lock:
+            self._cache.clear()
     
     def load_all_metrics(self, date: str) -> Dict[str, Any]:
+        cached = self._cache.get(date)
+        if cached is not None:
+            return cached
+        
+        metrics = self._read_metrics(date)
+        # Misses are not cached so files ingested later are picked up
+        if metrics is not None:
+            with self._cache_lock:
+                metrics = self._cache.setdefault(date, metrics)
+        return metrics
+    
+    def _read_metrics(self, date: str) -> Optional[Dict[str, Any]]:
         metrics = {}
         
         for folder, file_suffix in self.metric_folders.items():
@@ -27,8 +57,8 @@ class MetricLoader:
             
             if os.path.exists(file_path):
                 try:
-                    with open(file_path, 'r') as f:
-                        metrics[folder] = json.load(f)
+                    with open(file_path, 'rb') as f:
+                        metrics[folder] = orjson.loads(f.read())
                         logger.info(f"Successfully loaded {folder} metrics for {date} from {file_path}")
                 except Exception as e:
                     logger.error(f"Error loading {folder} metrics from {file_path}: {str(e)}")
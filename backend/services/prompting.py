@@ -0,0 +1,233 @@
+import functools
+import hashlib
+import heapq
+import logging
+import re
+import sys
+from datetime import datetime
+from typing import Dict, List, Tuple
+from services.ttl_cache import TTLCache
+
+logger = logging.getLogger(__name__)
+
+# Identical across requests so Azure OpenAI can serve it from the prompt cache
+SYSTEM_PROMPT = """You are an expert Site Reliability Engineer specializing in batch processing systems and root cause analysis.
+        You analyze complex distributed system failures involving AWS services (RDS, EKS, SQS) and provide clear, actionable insights.
+        
+        IMPORTANT: 
+        - Answer the user's specific question directly
+        - If they ask about something other than RCA/processing, respond appropriately
+        - Don't always provide full RCA analysis unless specifically asked
+        - Be conversational and helpful, not repetitive
+        - Focus on what the user actually wants to know
+        - When showing timelines, use the formatted timeline provided in the context
+        - Explain the cascading failure pattern when relevant
+        
+        Remember: 
+        - Focus on answering the user's specific question
+        - ALWAYS include the Detailed Timeline Analysis when discussing processing issues
+        - Show the cascading failure pattern with proper formatting
+        - When discussing infrastructure issues, be specific about which services had problems and when they occurred
+        - Use the timeline format with visual hierarchy (|, ├, └) to show relationships"""
+
+# The static guidance lives in SYSTEM_PROMPT and the question comes last, so every
+# request shares the longest possible identical prefix (prompt caching)
+PROMPT_TEMPLATE = """
+Context about derivatives batch processing:
+
+ANALYSIS RESULTS:
+- SLA Status: {sla_status}
+- Processing Duration: {processing_duration} hours (SLA: 3 hours)
+- Date: {date}
+- Processing Window: {window_start} to {window_end}
+
+ROOT CAUSES IDENTIFIED:
+{root_causes}
+
+DETAILED TIMELINE ANALYSIS FOR DERIVATIVES:
+{timeline}
+
+INFRASTRUCTURE ISSUES (detected during processing):
+{critical_metrics}
+Summary: {infra_summary}
+
+RECOMMENDATIONS:
+{recommendations}
+
+The user is asking: "{user_query}"
+
+Please answer their specific question using the context above.
+"""
+
+LOG_ANALYSIS_SYSTEM_PROMPT = """You are an expert DevOps engineer and log analyst.
+Analyze application logs to identify root causes, patterns, and provide actionable recommendations.
+Focus on:
+1. Identifying the primary root cause
+2. Understanding the error propagation chain
+3. Suggesting specific, actionable fixes
+4. Detecting patterns that might indicate systemic issues
+Always respond with valid JSON only, no markdown formatting."""
+
+# Shared by every request (never mutated), so each call only builds its user message
+SYSTEM_MESSAGE = {"role": "system", "content": SYSTEM_PROMPT}
+LOG_ANALYSIS_SYSTEM_MESSAGE = {"role": "system", "content": LOG_ANALYSIS_SYSTEM_PROMPT}
+
+# Static parts of the rule-based fallback response
+FALLBACK_BREACHED_HEADER = (
+    "## Root Cause Analysis for Derivatives Processing\n\n"
+    "**SLA Status:** ⚠️ BREACHED\n"
+    "**Processing Duration:** {duration} hours (exceeded 3-hour SLA by {excess} hours)\n\n"
+    "### Primary Root Causes:\n"
+)
+FALLBACK_MET_RESPONSE = (
+    "## Root Cause Analysis for Derivatives Processing\n\n"
+    "**SLA Status:** ✅ MET\n"
+    "**Processing Duration:** {duration} hours (within 3-hour SLA)\n\n"
+    "Processing completed successfully within SLA requirements.\n"
+)
+
+# Captures the body of a ```json fenced block (the closing fence may be missing)
+CODE_FENCE_RE = re.compile(r'^```(?:json)?\s*(.*?)(?:```|$)', re.DOTALL)
+
+# Appended to the prompt when several questions are answered in one completion
+BATCH_INSTRUCTIONS = """
+The user asked several numbered questions. Answer each of them in order, starting
+each answer with a line containing only ===ANSWER-<number>=== (e.g. ===ANSWER-1===).
+"""
+BATCH_ANSWER_RE = re.compile(r'^===ANSWER-(\d+)===[ \t]*$', re.MULTILINE)
+MAX_BATCH_TOKENS = 4000
+
+# Timeline severities worth surfacing to the model
+NOTABLE_SEVERITIES = frozenset(('critical', 'warning'))
+
+MAX_NOTABLE_EVENTS = 10
+
+# How timeline event details are laid out, as (matches(name_lower, details),
+# detail_lines(details, critical)) pairs checked in order; events that match
+# no rule get a single detail line
+PROMPT_TIMELINE_RULES = (
+    (lambda name, details: 'marker' in name and 'delayed' in details.lower(),
+     lambda details, critical: f"        | {details}\n        └ Upstream system issue"),
+    (lambda name, details: 'dag' in name and 'start' in name,
+     lambda details, critical: f"        └ {details}"),
+    (lambda name, details: 'rds' in name or 'database' in name,
+     lambda details, critical: f"        ├ {details}\n        └ Caused by: High concurrent queries + delayed processing"
+     if critical else f"        ├ {details}"),
+    (lambda name, details: 'sqs' in name or 'queue' in name,
+     lambda details, critical: f"        ├ {details}\n        └ Queue backup caused by slow processing"),
+    (lambda name, details: 'eks' in name,
+     lambda details, critical: f"        ├ {details}\n        └ Resource strain from delayed batch processing"),
+)
+FALLBACK_TIMELINE_RULES = (
+    (lambda name, details: 'marker' in name,
+     lambda details, critical: f"        | {details}\n        └ Upstream system delay\n"),
+    (lambda name, details: 'rds' in name or 'database' in name,
+     lambda details, critical: f"        ├ {details}\n        └ Database bottleneck from concurrent processing\n"
+     if critical else f"        ├ {details}\n"),
+    (lambda name, details: 'sqs' in name,
+     lambda details, critical: f"        ├ {details}\n        └ Queue backup from slow processing\n"),
+)
+
+# Critical events reported as infrastructure issues, checked in order: the service tag
+# in the event name and the keyword its details must mention (None for any)
+CRITICAL_METRIC_RULES = (('RDS', 'latency'), ('SQS', 'queue'), ('EKS', None))
+
+def scan_timeline(analysis: Dict) -> Tuple[List[Dict], List[Tuple[str, Dict]]]:
+    """
+    Walk the timeline once, collecting the first MAX_NOTABLE_EVENTS critical/warning events in
+    time order and the critical (service, event) pairs reported as infrastructure issues.
+    Kept on the analysis dict for the rest of the request, since the prompt context and the
+    fallback both need them.
+    """
+    scan = analysis.get('_timeline_scan')
+    if scan is not None:
+        return scan
+    
+    notable = []
+    critical_metrics = []
+    for event in analysis.get('timeline', ()):
+        severity = event['severity']
+        if severity not in NOTABLE_SEVERITIES:
+            continue
+        notable.append(event)
+        if severity != 'critical':
+            continue
+        event_name = event.get('event', '')
+        for service, keyword in CRITICAL_METRIC_RULES:
+            if service in event_name:
+                if keyword is None or keyword in event['details'].lower():
+                    critical_metrics.append((service, event))
+                break
+    
+    # Same result as sorting and slicing, without sorting every notable event
+    notable = heapq.nsmallest(MAX_NOTABLE_EVENTS, notable, key=lambda x: x.get('timestamp', ''))
+    scan = analysis['_timeline_scan'] = (notable, critical_metrics)
+    return scan
+
+def notable_events(analysis: Dict) -> List[Dict]:
+    return scan_timeline(analysis)[0]
+
+# datetime.fromisoformat accepts a trailing 'Z' from Python 3.11 on
+_FROMISOFORMAT_PARSES_Z = sys.version_info >= (3, 11)
+
+# Cheap pre-check so placeholders like 'N/A' are returned without raising
+ISO_DATE_RE = re.compile(r'\d{4}-\d{2}-\d{2}')
+
+@functools.lru_cache(maxsize=4096)
+def format_time_cached(timestamp: str) -> str:
+    """Format an ISO timestamp as e.g. '07:15 AM'; the same timestamps recur across prompts and fallbacks"""
+    if not isinstance(timestamp, str) or not ISO_DATE_RE.match(timestamp):
+        return timestamp
+    try:
+        iso = timestamp
+        if not _FROMISOFORMAT_PARSES_Z and iso.endswith('Z'):
+            iso = iso[:-1] + '+00:00'
+        dt = datetime.fromisoformat(iso)
+        return dt.strftime('%I:%M %p')
+    except ValueError:
+        return timestamp
+
+# Log excerpts longer than this are reduced to their high-signal lines before being
+# sent, keeping prompt tokens (and TPM usage) bounded for very noisy failures
+MAX_INLINE_LOG_CHARS = 20000
+MAX_LOG_LINE_CHARS = 1000
+LOG_CONTEXT_LINES = 3
+HIGH_SIGNAL_LINE_RE = re.compile(r'error|exception|traceback|warn|fatal|^===', re.IGNORECASE)
+
+def _head_tail(text: str, limit: int) -> str:
+    """Cut text to about limit characters, keeping a quarter from the start and the rest from the end"""
+    if len(text) <= limit:
+        return text
+    head = limit // 4
+    return f"{text[:head]}\n... [truncated {len(text) - limit} chars] ...\n{text[-(limit - head):]}"
+
+# Condensed excerpts keyed by a digest of the raw log, so the cache never pins the logs themselves
+_condensed_logs = TTLCache(ttl_seconds=3600, maxsize=32)
+
+def condense_log_content(log_content: str) -> str:
+    """
+    Keep the high-signal lines of an oversized log excerpt (plus surrounding context), within
+    MAX_INLINE_LOG_CHARS. Overflow is cut from the middle, since failures usually surface at the end.
+    """
+    if len(log_content) <= MAX_INLINE_LOG_CHARS:
+        return log_content
+    
+    key = hashlib.blake2b(log_content.encode('utf-8', 'surrogatepass'), digest_size=16).digest()
+    condensed = _condensed_logs.get(key)
+    if condensed is not None:
+        return condensed
+    
+    lines = log_content.split('\n')
+    keep = [False] * len(lines)
+    for i, line in enumerate(lines):
+        if HIGH_SIGNAL_LINE_RE.search(line):
+            for j in range(max(0, i - LOG_CONTEXT_LINES), min(len(lines), i + LOG_CONTEXT_LINES + 1)):
+                keep[j] = True
+    
+    excerpt = '\n'.join(line[:MAX_LOG_LINE_CHARS] for line, kept in zip(lines, keep) if kept)
+    # Without any keyword hits, fall back to the raw head and tail
+    condensed = _head_tail(excerpt or log_content, MAX_INLINE_LOG_CHARS)
+    
+    logger.info(f"Condensed log content from {len(log_content)} to {len(condensed)} characters for analysis")
+    _condensed_logs.set(key, condensed)
+    return condensed
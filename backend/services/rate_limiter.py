@@ -0,0 +1,38 @@
+import threading
+import time
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket. acquire() blocks until enough tokens have refilled;
+    refund() returns (or, with a negative amount, charges) tokens after the fact.
+    """
+
+    def __init__(self, capacity: float, refill_per_sec: float):
+        self.capacity = capacity
+        self.refill_per_sec = refill_per_sec
+        self._tokens = capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.refill_per_sec)
+        self._updated = now
+
+    def acquire(self, amount: float = 1):
+        # A request larger than the bucket would never fit, so it waits for a full bucket
+        amount = min(amount, self.capacity)
+        while True:
+            with self._lock:
+                self._refill()
+                if self._tokens >= amount:
+                    self._tokens -= amount
+                    return
+                wait = (amount - self._tokens) / self.refill_per_sec
+            time.sleep(wait)
+
+    def refund(self, amount: float):
+        with self._lock:
+            self._refill()
+            self._tokens = min(self.capacity, self._tokens + amount)
@@ -1,10 +1,14 @@
 from typing import Dict, List, Any, Optional, Tuple
 from datetime import datetime, timedelta, timezone
 import logging
+import orjson
 from services.log_analyzer import LogAnalyzer
 
 logger = logging.getLogger(__name__)
 
+# Must match the app's JSON provider so pre-serialized fragments are byte-identical
+JSON_OPTIONS = orjson.OPT_NON_STR_KEYS | orjson.OPT_SORT_KEYS
+
 class RCAAnalyzer:
     def __init__(self):
         self.sla_hours = 3
@@ -69,6 +73,11 @@ class RCAAnalyzer:
             logger.info(f"Failure logs loaded: available={failure_logs.get('available', False)}")
 
         analysis['metrics_summary'] = self._create_metrics_summary(metrics)
+
+        # The timeline and summary are the bulk of every chat response, so they are
+        # encoded once here and embedded as raw JSON by the API
+        analysis['timeline_json'] = orjson.dumps(analysis['timeline'], option=JSON_OPTIONS)
+        analysis['metrics_summary_json'] = orjson.dumps(analysis['metrics_summary'], option=JSON_OPTIONS)
         
         return analysis
     
@@ -248,19 +257,27 @@ class RCAAnalyzer:
         
         logger.info(f"Analyzing infrastructure between {start_time} and {end_time}")
         
+        # Parse the window bounds once instead of once per metric reading
+        try:
+            window_start = self._parse_timestamp(start_time) if start_time else None
+            window_end = self._parse_timestamp(end_time) if end_time else None
+        except Exception as e:
+            logger.warning(f"Error parsing processing window [{start_time}, {end_time}]: {e}")
+            window_start = window_end = None
+        
         if metrics.get('eksMetrics'):
             logger.info(f"Analyzing EKS metrics...")
-            issues['eks'] = self._analyze_eks_metrics(metrics['eksMetrics'], start_time, end_time)
+            issues['eks'] = self._analyze_eks_metrics(metrics['eksMetrics'], window_start, window_end)
             logger.info(f"Found {len(issues['eks'])} EKS issues")
         
         if metrics.get('rdsMetrics'):
             logger.info(f"Analyzing RDS metrics...")
-            issues['rds'] = self._analyze_rds_metrics(metrics['rdsMetrics'], start_time, end_time)
+            issues['rds'] = self._analyze_rds_metrics(metrics['rdsMetrics'], window_start, window_end)
             logger.info(f"Found {len(issues['rds'])} RDS issues")
         
         if metrics.get('sqsMetrics'):
             logger.info(f"Analyzing SQS metrics...")
-            issues['sqs'] = self._analyze_sqs_metrics(metrics['sqsMetrics'], start_time, end_time)
+            issues['sqs'] = self._analyze_sqs_metrics(metrics['sqsMetrics'], window_start, window_end)
             logger.info(f"Found {len(issues['sqs'])} SQS issues")
         
         for service_issues in [issues['eks'], issues['rds'], issues['sqs']]:
@@ -272,7 +289,7 @@ class RCAAnalyzer:
         
         return issues
     
-    def _analyze_eks_metrics(self, eks_data: Dict, start_time: str, end_time: str) -> List[Dict]:
+    def _analyze_eks_metrics(self, eks_data: Dict, start_time: Optional[datetime], end_time: Optional[datetime]) -> List[Dict]:
         issues = []
         thresholds = {
             'cpu_critical': 90, 'cpu_warning': 80,
@@ -330,7 +347,7 @@ class RCAAnalyzer:
         
         return issues
     
-    def _analyze_rds_metrics(self, rds_data: Dict, start_time: str, end_time: str) -> List[Dict]:
+    def _analyze_rds_metrics(self, rds_data: Dict, start_time: Optional[datetime], end_time: Optional[datetime]) -> List[Dict]:
         issues = []
         thresholds = {
             'cpu_critical': 95, 'cpu_warning': 85,  # Lowered to detect 89.6%
@@ -400,7 +417,7 @@ class RCAAnalyzer:
         
         return issues
     
-    def _analyze_sqs_metrics(self, sqs_data: Dict, start_time: str, end_time: str) -> List[Dict]:
+    def _analyze_sqs_metrics(self, sqs_data: Dict, start_time: Optional[datetime], end_time: Optional[datetime]) -> List[Dict]:
         issues = []
         thresholds = {
             'age_critical': 600, 'age_warning': 300,
@@ -627,60 +644,28 @@ class RCAAnalyzer:
         
         return summary
     
-    def _is_within_timeframe(self, timestamp: str, start_time: str, end_time: str) -> bool:
-        if not timestamp or not start_time or not end_time:
+    def _parse_timestamp(self, timestamp: str) -> datetime:
+        """Parse an ISO timestamp (with or without 'Z'), treating naive values as UTC"""
+        ts_str = timestamp.strip()
+        if ts_str.endswith('Z'):
+            ts_str = ts_str[:-1] + '+00:00'
+        ts = datetime.fromisoformat(ts_str)
+        if ts.tzinfo is None:
+            ts = ts.replace(tzinfo=timezone.utc)
+        return ts
+    
+    def _is_within_timeframe(self, timestamp: str, start: Optional[datetime], end: Optional[datetime]) -> bool:
+        if not timestamp or start is None or end is None:
             return False
         try:
-            # Parse timestamps, handling both with and without 'Z'
-            ts_str = timestamp.strip()
-            start_str = start_time.strip()
-            end_str = end_time.strip()
-            
-            # Parse timestamp with timezone handling
-            if ts_str.endswith('Z'):
-                ts = datetime.fromisoformat(ts_str.replace('Z', '+00:00'))
-            elif 'T' in ts_str and ('+' in ts_str or ts_str.count(':') >= 3):
-                ts = datetime.fromisoformat(ts_str)
-            else:
-                ts = datetime.fromisoformat(ts_str)
-                if ts.tzinfo is None:
-                    ts = ts.replace(tzinfo=timezone.utc)
-            
-            # Parse start time
-            if start_str.endswith('Z'):
-                start = datetime.fromisoformat(start_str.replace('Z', '+00:00'))
-            elif 'T' in start_str and ('+' in start_str or start_str.count(':') >= 3):
-                start = datetime.fromisoformat(start_str)
-            else:
-                start = datetime.fromisoformat(start_str)
-                if start.tzinfo is None:
-                    start = start.replace(tzinfo=timezone.utc)
-            
-            # Parse end time
-            if end_str.endswith('Z'):
-                end = datetime.fromisoformat(end_str.replace('Z', '+00:00'))
-            elif 'T' in end_str and ('+' in end_str or end_str.count(':') >= 3):
-                end = datetime.fromisoformat(end_str)
-            else:
-                end = datetime.fromisoformat(end_str)
-                if end.tzinfo is None:
-                    end = end.replace(tzinfo=timezone.utc)
-            
-            # Ensure all have same timezone awareness
-            if ts.tzinfo is None and (start.tzinfo is not None or end.tzinfo is not None):
-                ts = ts.replace(tzinfo=timezone.utc)
-            elif ts.tzinfo is not None and start.tzinfo is None:
-                start = start.replace(tzinfo=timezone.utc)
-            elif ts.tzinfo is not None and end.tzinfo is None:
-                end = end.replace(tzinfo=timezone.utc)
-            
+            ts = self._parse_timestamp(timestamp)
             result = start <= ts <= end
             if result:
-                logger.debug(f"Timestamp {ts_str} is within timeframe [{start_str}, {end_str}]")
+                logger.debug("Timestamp %s is within timeframe [%s, %s]", timestamp, start, end)
             return result
         except Exception as e:
             logger.warning(f"Error comparing timestamps: {e}")
             logger.warning(f"  timestamp: {timestamp}")
-            logger.warning(f"  start_time: {start_time}")
-            logger.warning(f"  end_time: {end_time}")
-            return False
\ No newline at end of file
+            logger.warning(f"  start_time: {start}")
+            logger.warning(f"  end_time: {end}")
+            return False
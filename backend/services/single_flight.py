@@ -0,0 +1,41 @@
+import threading
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, Hashable
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class SingleFlight:
+    """
+    Coalesce concurrent calls that share a key.
+    The first caller runs the function; callers arriving while it is in flight
+    wait for and receive the same result (or exception).
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls: Dict[Hashable, Future] = {}
+
+    def do(self, key: Hashable, fn: Callable[..., Any], *args, **kwargs) -> Any:
+        with self._lock:
+            call = self._calls.get(key)
+            is_leader = call is None
+            if is_leader:
+                call = Future()
+                self._calls[key] = call
+
+        if not is_leader:
+            logger.debug(f"Joining in-flight call for key: {key}")
+            return call.result()
+
+        try:
+            result = fn(*args, **kwargs)
+            call.set_result(result)
+            return result
+        except BaseException as e:
+            call.set_exception(e)
+            raise
+        finally:
+            with self._lock:
+                self._calls.pop(key, None)
@@ -0,0 +1,57 @@
+import hashlib
+import threading
+from collections import Counter
+from typing import Any, Callable
+import logging
+from prometheus_client import Histogram
+
+logger = logging.getLogger(__name__)
+
+PHASE_SECONDS = Histogram(
+    'rca_phase_duration_seconds',
+    'Time spent in each phase of a chat request',
+    ['phase'],
+    buckets=(0.001, 0.005, 0.01, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120)
+)
+
+
+def time_phase(phase: str):
+    """Context manager recording the duration of a request phase"""
+    return PHASE_SECONDS.labels(phase=phase).time()
+
+
+def timed_call(phase: str, fn: Callable[..., Any], *args, **kwargs) -> Any:
+    """Call fn, recording its duration under the given phase"""
+    with time_phase(phase):
+        return fn(*args, **kwargs)
+
+
+class HotQueryCounter:
+    """
+    Count how often each (date, query) pair is requested and log once a pair
+    crosses the threshold; those are the candidates for caching or pre-materializing.
+    """
+
+    def __init__(self, threshold: int = 10, max_keys: int = 10000):
+        self.threshold = threshold
+        self.max_keys = max_keys
+        self._counts: Counter = Counter()
+        self._lock = threading.Lock()
+
+    def record(self, date: str, query: str) -> int:
+        query_hash = hashlib.blake2b(query.encode('utf-8'), digest_size=8).hexdigest()
+        key = (date, query_hash)
+        with self._lock:
+            self._counts[key] += 1
+            count = self._counts[key]
+            if len(self._counts) > self.max_keys:
+                # Keep the hottest half so memory stays bounded
+                self._counts = Counter(dict(self._counts.most_common(self.max_keys // 2)))
+
+        if count == self.threshold:
+            logger.info(f"Hot query detected: date={date} query_hash={query_hash} count={count}")
+        return count
+
+    def top(self, n: int = 10):
+        with self._lock:
+            return self._counts.most_common(n)
@@ -0,0 +1,43 @@
+import threading
+import time
+from typing import Any, Dict, Hashable, Optional, Tuple
+
+
+class TTLCache:
+    """
+    Thread-safe key/value cache whose entries expire after ttl_seconds.
+    When full, expired entries are dropped first, then the oldest insertions.
+    """
+
+    def __init__(self, ttl_seconds: float, maxsize: int = 128):
+        self.ttl_seconds = ttl_seconds
+        self.maxsize = maxsize
+        self._entries: Dict[Hashable, Tuple[float, Any]] = {}
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable, default: Optional[Any] = None) -> Any:
+        entry = self._entries.get(key)
+        if entry is None:
+            return default
+        expires_at, value = entry
+        if time.monotonic() >= expires_at:
+            with self._lock:
+                # A concurrent set() may have refreshed the key since it was read
+                if self._entries.get(key) is entry:
+                    del self._entries[key]
+            return default
+        return value
+
+    def set(self, key: Hashable, value: Any):
+        with self._lock:
+            now = time.monotonic()
+            if key not in self._entries and len(self._entries) >= self.maxsize:
+                for expired_key in [k for k, (exp, _) in self._entries.items() if now >= exp]:
+                    del self._entries[expired_key]
+                while len(self._entries) >= self.maxsize:
+                    del self._entries[next(iter(self._entries))]
+            self._entries[key] = (now + self.ttl_seconds, value)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
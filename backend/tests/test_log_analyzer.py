@@ -0,0 +1,131 @@
+import gzip
+import json
+import os
+
+import pytest
+
+from services import log_analyzer
+from services.log_analyzer import LogAnalyzer
+
+DATE = '2025-01-01'
+# load_failure_logs() output of the analyzer before the single-pass scanner, on sample_log_lines()
+BASELINE_PATH = os.path.join(os.path.dirname(__file__), 'data', 'log_analyzer_baseline.json')
+
+
+def sample_log_lines():
+    """A log exercising every scanner path: levels, traces, overlaps, caps and long lines"""
+    lines = []
+
+    def ts(i):
+        return f"2025-01-01 10:{i // 60 % 60:02d}:{i % 60:02d},{i % 1000:03d}"
+
+    for i in range(400):
+        t = ts(i)
+        if i % 37 == 5:
+            lines.append(f"{t} ERROR [worker-{i % 4}] Connection timeout talking to db-{i}")
+        elif i == 44:
+            lines.append(f"{t} ERROR [worker] second failure right after the first")
+        elif i % 13 == 3:
+            lines.append(f"{t} WARNING: queue depth {i} above threshold")
+        elif i % 53 == 20:
+            lines.append("Traceback (most recent call last):")
+            lines.append(f'  File "/app/job.py", line {i}, in run')
+            lines.append("    process(batch)")
+            lines.append(f"ValueError: bad batch {i}")
+            lines.append("")
+        elif i % 71 == 30:
+            lines.append(f"{t} FATAL java.lang.NullPointerException: null")
+            lines.append("    at com.example.Job.run(Job.java:42)")
+            lines.append("    at com.example.Main.main(Main.java:7)")
+        elif i == 150:
+            lines.append(f"{t} CRITICAL disk almost full")
+        elif i == 160:
+            lines.append(f"{t} INFO ошибка? no: Exception in handler ünïcode")
+        elif i == 170:
+            # Level word inside the first 8 KB of an oversized line: matched, and kept whole
+            lines.append(f"{t} WARN payload=" + "aB9/" * 2500)
+        elif i == 180:
+            lines.append(f"{t} INFO lowercase error: permission denied for file")
+        else:
+            lines.append(f"{t} INFO step {i} ok")
+    return lines
+
+
+def write_log(base_path, lines, compressed=False):
+    folder = os.path.join(base_path, 'failed_dag_log')
+    os.makedirs(folder, exist_ok=True)
+    content = '\n'.join(lines) + '\n'
+    if compressed:
+        path = os.path.join(folder, f'{DATE}_stderr.gz')
+        with gzip.open(path, 'wt', encoding='utf-8') as f:
+            f.write(content)
+    else:
+        path = os.path.join(folder, f'{DATE}_stderr.txt')
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(content)
+    return path
+
+
+def analyze(base_path):
+    result = LogAnalyzer(str(base_path)).load_failure_logs(DATE)
+    result['file_path'] = None
+    return result
+
+
+@pytest.mark.parametrize('compressed', [False, True])
+def test_matches_baseline_analyzer(tmp_path, compressed):
+    write_log(tmp_path, sample_log_lines(), compressed=compressed)
+    with open(BASELINE_PATH, encoding='utf-8') as f:
+        baseline = json.load(f)
+
+    assert analyze(tmp_path) == baseline
+
+
+def test_sample_log_hits_every_cap(tmp_path):
+    write_log(tmp_path, sample_log_lines())
+    analyzer = LogAnalyzer(str(tmp_path))
+    result = analyzer.load_failure_logs(DATE)
+
+    assert result['available']
+    assert len(result['error_contexts']) == analyzer.max_error_contexts
+    assert len(result['stack_traces']) == analyzer.max_stack_traces
+    assert len(result['log_metadata']['error_timeline']) == analyzer.max_timeline_events
+    # Errors are counted as reported contexts; warnings are counted over the whole log
+    assert result['total_errors_found'] == analyzer.max_error_contexts
+    assert result['warnings_found'] > analyzer.max_timeline_events
+
+
+def test_lower_caps_are_respected(tmp_path):
+    write_log(tmp_path, sample_log_lines())
+    analyzer = LogAnalyzer(str(tmp_path))
+    analyzer.max_error_contexts = 2
+    analyzer.max_stack_traces = 1
+    analyzer.max_timeline_events = 4
+    result = analyzer.load_failure_logs(DATE)
+
+    assert len(result['error_contexts']) == 2
+    assert len(result['stack_traces']) == 1
+    assert len(result['log_metadata']['error_timeline']) == 4
+    assert result['total_errors_found'] == 2
+    assert result['warnings_found'] == analyze(tmp_path)['warnings_found']
+
+
+def test_lines_over_scan_limit(tmp_path):
+    payload = 'x' * log_analyzer.MAX_SCAN_LINE_CHARS
+    long_error = f"2025-01-01 10:00:01 ERROR upload failed body={payload}"
+    lines = [
+        "2025-01-01 10:00:00 INFO start",
+        long_error,
+        # A level word past the scanned prefix is not looked for
+        f"2025-01-01 10:00:02 INFO body={payload} ERROR",
+        "2025-01-01 10:00:03 INFO done",
+    ]
+    write_log(tmp_path, lines)
+    result = LogAnalyzer(str(tmp_path)).load_failure_logs(DATE)
+
+    assert result['total_errors_found'] == 1
+    assert result['warnings_found'] == 0
+    context = result['error_contexts'][0]
+    assert context['error_line_number'] == 2
+    # The oversized line itself is kept whole in the context
+    assert long_error in [line['content'] for line in context['context']]
@@ -0,0 +1,68 @@
+import pytest
+
+from services import rate_limiter
+from services.rate_limiter import TokenBucket
+
+
+class FakeTime:
+    """Stands in for time.monotonic/time.sleep so waits are instant and measurable"""
+
+    def __init__(self):
+        self.now = 0.0
+        self.slept = []
+
+    def monotonic(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.slept.append(seconds)
+        self.now += seconds
+
+
+@pytest.fixture
+def fake_time(monkeypatch):
+    fake = FakeTime()
+    monkeypatch.setattr(rate_limiter.time, 'monotonic', fake.monotonic)
+    monkeypatch.setattr(rate_limiter.time, 'sleep', fake.sleep)
+    return fake
+
+
+def test_acquire_within_capacity_does_not_wait(fake_time):
+    bucket = TokenBucket(capacity=100, refill_per_sec=10)
+    bucket.acquire(60)
+    bucket.acquire(40)
+    assert fake_time.slept == []
+    assert bucket._tokens == 0
+
+
+def test_acquire_waits_for_refill(fake_time):
+    bucket = TokenBucket(capacity=100, refill_per_sec=10)
+    bucket.acquire(100)
+    bucket.acquire(25)
+    assert sum(fake_time.slept) == pytest.approx(2.5)
+    assert bucket._tokens == pytest.approx(0)
+
+
+def test_oversized_request_waits_for_a_full_bucket(fake_time):
+    bucket = TokenBucket(capacity=100, refill_per_sec=10)
+    bucket.acquire(100)
+    bucket.acquire(500)
+    assert sum(fake_time.slept) == pytest.approx(10)
+
+
+def test_refund_returns_tokens_up_to_capacity(fake_time):
+    bucket = TokenBucket(capacity=100, refill_per_sec=10)
+    bucket.acquire(80)
+    bucket.refund(30)
+    assert bucket._tokens == pytest.approx(50)
+    bucket.refund(500)
+    assert bucket._tokens == pytest.approx(100)
+
+
+def test_negative_refund_charges_the_difference(fake_time):
+    bucket = TokenBucket(capacity=100, refill_per_sec=10)
+    bucket.acquire(50)
+    bucket.refund(-20)  # the request used more than was estimated
+    assert bucket._tokens == pytest.approx(30)
+    bucket.acquire(40)
+    assert sum(fake_time.slept) == pytest.approx(1)
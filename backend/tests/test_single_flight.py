@@ -0,0 +1,79 @@
+import threading
+import time
+
+import pytest
+
+from services.single_flight import SingleFlight
+
+
+def _run_followers(flight, key, fn, count):
+    results = [None] * count
+    errors = [None] * count
+
+    def follow(i):
+        try:
+            results[i] = flight.do(key, fn)
+        except Exception as e:
+            errors[i] = e
+
+    threads = [threading.Thread(target=follow, args=(i,)) for i in range(count)]
+    for thread in threads:
+        thread.start()
+    return threads, results, errors
+
+
+def test_concurrent_callers_share_one_call():
+    flight = SingleFlight()
+    started = threading.Event()
+    release = threading.Event()
+    calls = []
+
+    def slow():
+        calls.append(1)
+        started.set()
+        release.wait(5)
+        return {'answer': 42}
+
+    leader, leader_results, _ = _run_followers(flight, 'date', slow, 1)
+    assert started.wait(5)
+    followers, results, errors = _run_followers(flight, 'date', slow, 3)
+    time.sleep(0.1)  # let the followers reach the in-flight call
+    release.set()
+    for thread in leader + followers:
+        thread.join(5)
+
+    assert len(calls) == 1
+    assert errors == [None, None, None]
+    assert all(result is leader_results[0] for result in results)
+
+
+def test_errors_reach_every_caller_and_are_not_cached():
+    flight = SingleFlight()
+    started = threading.Event()
+    release = threading.Event()
+
+    def failing():
+        started.set()
+        release.wait(5)
+        raise ValueError('boom')
+
+    leader, _, leader_errors = _run_followers(flight, 'date', failing, 1)
+    assert started.wait(5)
+    followers, _, errors = _run_followers(flight, 'date', failing, 2)
+    time.sleep(0.1)
+    release.set()
+    for thread in leader + followers:
+        thread.join(5)
+
+    assert all(isinstance(error, ValueError) for error in leader_errors + errors)
+    # The failed call is forgotten, so the next caller runs the function again
+    assert flight.do('date', lambda: 'recovered') == 'recovered'
+
+
+def test_different_keys_run_separately():
+    flight = SingleFlight()
+    assert flight.do('a', lambda: 1) == 1
+    assert flight.do('b', lambda: 2) == 2
+    with pytest.raises(KeyError):
+        flight.do('a', lambda: {}['missing'])
+    assert flight._calls == {}
@@ -0,0 +1,74 @@
+from services import ttl_cache
+from services.ttl_cache import TTLCache
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_entries_expire_after_ttl(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(ttl_cache.time, 'monotonic', clock)
+    cache = TTLCache(ttl_seconds=10)
+    cache.set('k', 'v')
+
+    clock.now += 9.9
+    assert cache.get('k') == 'v'
+    clock.now += 0.1
+    assert cache.get('k') is None
+    assert cache.get('k', 'default') == 'default'
+    assert 'k' not in cache._entries
+
+
+def test_full_cache_drops_expired_then_oldest(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(ttl_cache.time, 'monotonic', clock)
+    cache = TTLCache(ttl_seconds=10, maxsize=2)
+    cache.set('old', 1)
+    clock.now += 5
+    cache.set('newer', 2)
+    clock.now += 6  # 'old' has expired, 'newer' has not
+    cache.set('third', 3)
+    assert cache.get('old') is None
+    assert cache.get('newer') == 2
+
+    cache.set('fourth', 4)  # nothing expired: the oldest insertion goes
+    assert cache.get('newer') is None
+    assert cache.get('third') == 3
+    assert cache.get('fourth') == 4
+
+
+def test_refresh_racing_expiry_is_kept(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(ttl_cache.time, 'monotonic', clock)
+    cache = TTLCache(ttl_seconds=10)
+    cache.set('k', 'stale')
+    clock.now += 10
+
+    real_lock = cache._lock
+
+    class RefreshFirst:
+        """Lets a set() of the same key land between get()'s read and its eviction"""
+
+        def __enter__(self):
+            cache._lock = real_lock
+            cache.set('k', 'fresh')
+            real_lock.acquire()
+
+        def __exit__(self, *exc):
+            real_lock.release()
+
+    cache._lock = RefreshFirst()
+    assert cache.get('k') is None  # get() had already read the expired entry
+    assert cache.get('k') == 'fresh'
+
+
+def test_clear():
+    cache = TTLCache(ttl_seconds=10)
+    cache.set('k', 'v')
+    cache.clear()
+    assert cache.get('k') is None
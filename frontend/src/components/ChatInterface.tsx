@@ -22,8 +22,8 @@ import MessageList from './MessageList';
 import ChatInput from './ChatInput';
 import Timeline from './Timeline';
 import MetricsPanel from './MetricsPanel';
-import { Message, ChatResponse } from '../types';
-import { sendChatMessage } from '../services/api';
+import { Message, MessageMetadata, ChatStreamSteps } from '../types';
+import { streamChatMessage } from '../services/api';
 import { v4 as uuidv4 } from 'uuid';
 
 interface ChatInterfaceProps {
@@ -49,7 +49,7 @@ const ChatInterface: React.FC<ChatInterfaceProps> = ({
   const [selectedDate, setSelectedDate] = useState('2025-08-01');
   const [showTimeline, setShowTimeline] = useState(false);
   const [showMetrics, setShowMetrics] = useState(false);
-  const [currentResponse, setCurrentResponse] = useState<ChatResponse | null>(null);
+  const [currentResponse, setCurrentResponse] = useState<ChatStreamSteps | null>(null);
   const [error, setError] = useState<string | null>(null);
   const messagesEndRef = useRef<null | HTMLDivElement>(null);
 
@@ -84,32 +84,46 @@ const ChatInterface: React.FC<ChatInterfaceProps> = ({
     setMessages((prev) => [...prev, typingMessage]);
 
     try {
-      const response = await sendChatMessage(content, selectedDate);
-      setCurrentResponse(response);
-
-      const botMessage: Message = {
-        id: uuidv4(),
-        content: response.analysis,
-        sender: 'bot',
-        timestamp: new Date(),
-        metadata: {
-          timeline: response.timeline,
-          metrics_summary: response.metrics_summary,
-          sla_status: response.sla_status,
-          root_causes: response.root_causes,
+      let answer = '';
+      let metadata: MessageMetadata = {};
+
+      // Show the timeline and metrics as soon as the analysis arrives, then the answer token by token
+      await streamChatMessage(content, selectedDate, {
+        onSteps: (data) => {
+          setCurrentResponse(data);
+          metadata = {
+            timeline: data.timeline,
+            metrics_summary: data.metrics_summary,
+            sla_status: data.sla_status,
+            root_causes: data.root_causes,
+          };
+          if (data.timeline && data.timeline.length > 0) {
+            setShowTimeline(true);
+          }
+          if (data.metrics_summary) {
+            setShowMetrics(true);
+          }
         },
-      };
+        onToken: (token) => {
+          answer += token;
+          setMessages((prev) =>
+            prev.map((msg) =>
+              msg.id === typingMessage.id ? { ...msg, content: answer, isTyping: false } : msg
+            )
+          );
+        },
+        onFailureLogs: (failureLogs) => {
+          metadata = { ...metadata, failure_logs: failureLogs || undefined };
+        },
+      });
 
       setMessages((prev) =>
-        prev.filter((msg) => msg.id !== typingMessage.id).concat(botMessage)
+        prev.map((msg) =>
+          msg.id === typingMessage.id
+            ? { ...msg, content: answer, isTyping: false, metadata }
+            : msg
+        )
       );
-
-      if (response.timeline && response.timeline.length > 0) {
-        setShowTimeline(true);
-      }
-      if (response.metrics_summary) {
-        setShowMetrics(true);
-      }
     } catch (err: any) {
       setMessages((prev) => prev.filter((msg) => msg.id !== typingMessage.id));
 
@@ -11,8 +11,8 @@ import {
 } from '@mui/icons-material';
 import SimpleMessageList from './SimpleMessageList';
 import SimpleChatInput from './SimpleChatInput';
-import { Message, ChatResponse } from '../types';
-import { sendChatMessage } from '../services/api';
+import { Message, MessageMetadata, SLAStatus } from '../types';
+import { streamChatMessage } from '../services/api';
 import { v4 as uuidv4 } from 'uuid';
 
 interface SimpleChatInterfaceProps {
@@ -82,69 +82,18 @@ const SimpleChatInterface: React.FC<SimpleChatInterfaceProps> = ({
     return processingKeywords.some(keyword => lowerQuery.includes(keyword));
   };
 
-  const simulateStreamingResponse = async (
-    response: ChatResponse,
-    messageId: string,
-    showStreaming: boolean
-  ) => {
-    if (showStreaming && response.sla_status) {
-      // Show step-by-step analysis for RCA queries
-      const steps = [
-        { text: "✓ Checking marker event arrival time...", delay: 500 },
-        { text: `\n→ Marker arrived at ${response.sla_status?.arrival_time || 'N/A'}`, delay: 800 },
-        { text: "\n\n✓ Analyzing DAG processing metrics...", delay: 600 },
-        { text: `\n→ Processing completed at ${response.sla_status?.completion_time || 'N/A'}`, delay: 800 },
-        { text: `\n→ Duration: ${response.sla_status?.duration_hours || 'N/A'} hours (SLA: 3 hours)`, delay: 700 },
-        { text: "\n\n✓ Checking infrastructure metrics...", delay: 600 },
-        { text: "\n→ Analyzing EKS, RDS, and SQS performance during processing window", delay: 1000 },
-        { text: "\n\n✓ Generating Root Cause Analysis...\n\n", delay: 800 },
-      ];
-
-      let fullContent = "";
-      
-      for (const step of steps) {
-        fullContent += step.text;
-        setMessages((prev) =>
-          prev.map((msg) =>
-            msg.id === messageId
-              ? { ...msg, content: fullContent, isTyping: true }
-              : msg
-          )
-        );
-        await new Promise((resolve) => setTimeout(resolve, step.delay));
-      }
-
-      // Add the final analysis
-      fullContent += response.analysis;
-      setMessages((prev) =>
-        prev.map((msg) =>
-          msg.id === messageId
-            ? { ...msg, content: fullContent, isTyping: false, metadata: {
-                timeline: response.timeline,
-                metrics_summary: response.metrics_summary,
-                sla_status: response.sla_status,
-                root_causes: response.root_causes,
-                failure_logs: response.failure_logs,
-              }}
-            : msg
-        )
-      );
-    } else {
-      // Direct response for non-RCA queries
-      setMessages((prev) =>
-        prev.map((msg) =>
-          msg.id === messageId
-            ? { ...msg, content: response.analysis, isTyping: false, metadata: {
-                timeline: response.timeline,
-                metrics_summary: response.metrics_summary,
-                sla_status: response.sla_status,
-                root_causes: response.root_causes,
-                failure_logs: response.failure_logs,
-              }}
-            : msg
-        )
-      );
-    }
+  const buildStepSummary = (slaStatus: SLAStatus): string => {
+    // Step-by-step analysis shown ahead of the streamed RCA answer
+    return [
+      "✓ Checking marker event arrival time...",
+      `\n→ Marker arrived at ${slaStatus.arrival_time || 'N/A'}`,
+      "\n\n✓ Analyzing DAG processing metrics...",
+      `\n→ Processing completed at ${slaStatus.completion_time || 'N/A'}`,
+      `\n→ Duration: ${slaStatus.duration_hours || 'N/A'} hours (SLA: 3 hours)`,
+      "\n\n✓ Checking infrastructure metrics...",
+      "\n→ Analyzing EKS, RDS, and SQS performance during processing window",
+      "\n\n✓ Generating Root Cause Analysis...\n\n",
+    ].join('');
   };
 
   const handleSendMessage = async (content: string) => {
@@ -171,13 +120,54 @@ const SimpleChatInterface: React.FC<SimpleChatInterfaceProps> = ({
 
     try {
       const date = extractDateFromQuery(content);
-      const response = await sendChatMessage(content, date);
-      
-      // Check if we should show streaming analysis
+
+      // Check if we should show the step-by-step analysis
       const showStreaming = shouldShowStreamingAnalysis(content);
-      
-      // Simulate streaming response
-      await simulateStreamingResponse(response, botMessageId, showStreaming);
+
+      let stepSummary = '';
+      let answer = '';
+      let metadata: MessageMetadata = {};
+
+      const updateBotMessage = (isTyping: boolean) => {
+        const fullContent = stepSummary + answer;
+        setMessages((prev) =>
+          prev.map((msg) =>
+            msg.id === botMessageId
+              ? {
+                  ...msg,
+                  content: fullContent || msg.content,
+                  isTyping,
+                  metadata: isTyping ? msg.metadata : metadata,
+                }
+              : msg
+          )
+        );
+      };
+
+      // Render analysis steps as soon as they arrive, then the answer token by token
+      await streamChatMessage(content, date, {
+        onSteps: (data) => {
+          metadata = {
+            timeline: data.timeline,
+            metrics_summary: data.metrics_summary,
+            sla_status: data.sla_status,
+            root_causes: data.root_causes,
+          };
+          if (showStreaming && data.sla_status) {
+            stepSummary = buildStepSummary(data.sla_status);
+            updateBotMessage(true);
+          }
+        },
+        onToken: (token) => {
+          answer += token;
+          updateBotMessage(true);
+        },
+        onFailureLogs: (failureLogs) => {
+          metadata = { ...metadata, failure_logs: failureLogs || undefined };
+        },
+      });
+
+      updateBotMessage(false);
       
     } catch (err) {
       let errorMessage = 'An error occurred';
@@ -1,5 +1,5 @@
 import axios from 'axios';
-import { ChatResponse, HealthStatus } from '../types';
+import { ChatResponse, ChatStreamHandlers, HealthStatus } from '../types';
 
 const API_BASE_URL = process.env.REACT_APP_API_URL || 'http://localhost:5000';
 
@@ -28,6 +28,66 @@ export const sendChatMessage = async (
   }
 };
 
+export const streamChatMessage = async (
+  query: string,
+  date: string = '2025-08-01',
+  handlers: ChatStreamHandlers
+): Promise<void> => {
+  const response = await fetch(`${API_BASE_URL}/api/chat/stream`, {
+    method: 'POST',
+    headers: { 'Content-Type': 'application/json' },
+    body: JSON.stringify({ query, date }),
+  });
+
+  if (!response.ok || !response.body) {
+    const body = await response.json().catch(() => ({}));
+    throw new Error(body.error || 'Failed to process request');
+  }
+
+  const reader = response.body.getReader();
+  const decoder = new TextDecoder();
+  let buffer = '';
+
+  while (true) {
+    const { done, value } = await reader.read();
+    if (done) break;
+    buffer += decoder.decode(value, { stream: true });
+
+    // Server-Sent Events are separated by a blank line
+    let boundary = buffer.indexOf('\n\n');
+    while (boundary !== -1) {
+      const rawEvent = buffer.slice(0, boundary);
+      buffer = buffer.slice(boundary + 2);
+      boundary = buffer.indexOf('\n\n');
+
+      let event = 'message';
+      let data = '';
+      for (const line of rawEvent.split('\n')) {
+        if (line.startsWith('event: ')) {
+          event = line.slice(7);
+        } else if (line.startsWith('data: ')) {
+          data += line.slice(6);
+        }
+      }
+      const payload = data ? JSON.parse(data) : null;
+
+      switch (event) {
+        case 'steps':
+          handlers.onSteps?.(payload);
+          break;
+        case 'token':
+          handlers.onToken(payload.content);
+          break;
+        case 'failure_logs':
+          handlers.onFailureLogs?.(payload);
+          break;
+        case 'error':
+          throw new Error(payload.error || 'Failed to process request');
+      }
+    }
+  }
+};
+
 export const checkHealth = async (): Promise<HealthStatus> => {
   try {
     const response = await api.get<HealthStatus>('/api/health');
@@ -119,12 +119,32 @@ export interface ChatResponse {
   timestamp: string;
 }
 
+export interface AnalysisSteps {
+  marker_check: { status: string; data: any };
+  dag_analysis: { status: string; data: any };
+  infrastructure_check: { status: string; data: MetricsSummary };
+}
+
+export interface ChatStreamSteps {
+  steps: AnalysisSteps;
+  timeline: TimelineEvent[];
+  metrics_summary: MetricsSummary;
+  sla_status: SLAStatus;
+  root_causes: RootCause[];
+}
+
+export interface ChatStreamHandlers {
+  onSteps?: (data: ChatStreamSteps) => void;
+  onToken: (content: string) => void;
+  onFailureLogs?: (failureLogs: FailureLogs | null) => void;
+}
+
 export interface HealthStatus {
   status: string;
   timestamp: string;
   services: {
     metric_loader: string;
     rca_analyzer: string;
-    azure_ai: boolean;
+    azure_ai: boolean | 'lazy';
   };
 }
\ No newline at end of file
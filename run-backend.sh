@@ -17,6 +17,11 @@ if [ ! -f .env ]; then
     echo "Please update .env with your Azure OpenAI credentials"
 fi
 
-# Run Flask app
-echo "Starting Flask backend on http://localhost:5000"
-python app.py
\ No newline at end of file
+# Run Flask app (FLASK_DEBUG=true uses the Flask dev server with reloader)
+if [ "${FLASK_DEBUG,,}" = "true" ]; then
+    echo "Starting Flask development server on http://localhost:${PORT:-5000}"
+    python app.py
+else
+    echo "Starting Flask backend under gunicorn on http://localhost:${PORT:-5000}"
+    gunicorn -c gunicorn.conf.py app:app
+fi
\ No newline at end of file